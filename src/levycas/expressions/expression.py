@@ -1,9 +1,10 @@
 """Classes for internal representations of mathematical expressions"""
-from math import lcm, comb, factorial
+from math import lcm, comb, factorial, gcd
 from fractions import Fraction
 from numbers import Number
 
-from functools import cache
+from functools import cache, cached_property
+from weakref import WeakValueDictionary
 
 """Undefined flyweight; default value for expressions that can not be evaluated
 """
@@ -17,6 +18,9 @@ MIN_ERROR = 10 ** -30
 class Expression:
     """Expression is the base class for all mathematical operations in LevyCAS."""
 
+    #Set on the results of levycas.operations.simplify, which then skips them
+    _simplified = False
+
     def __init__(self, *args):
         assert len(args) == 2
         self.left = args[0]
@@ -42,6 +46,22 @@ class Expression:
     def denom(self):
         return Integer(1)
 
+    @cached_property
+    def free_vars(self) -> frozenset:
+        """The set of Variables appearing anywhere in this expression, computed once per node."""
+        free = set()
+        for operand in self.operands():
+            if isinstance(operand, Expression):
+                free |= operand.free_vars
+        return frozenset(free)
+
+    @cached_property
+    def poly_vars(self) -> frozenset:
+        """The generalized variables of this expression read as a polynomial, computed once per node.
+        
+        See levycas.operations.variables."""
+        return frozenset((self,))
+
     #The following dunder methods allow us to treat python statements as ASTs
     def __eq__(self, other):
         """Check if two expressions are syntactically equal. 
@@ -49,11 +69,29 @@ class Expression:
         For this to make sense, both expressions should be ASAE 
         (Automatically-Simplified Arithmetic Expressions).
         """
+        if self is other:
+            return True
+        if isinstance(other, Expression):
+            return self._repr == other._repr
         other = other if isinstance(other, str) else repr(other)
-        return repr(self) == other
+        return self._repr == other
 
     def __hash__(self):
-        return hash(repr(self))
+        return hash(self._repr)
+
+    @cached_property
+    def _repr(self) -> str:
+        """repr(self), built once per node for equality and hashing. Sound since expressions are not
+        mutated once built; the string also caches its own hash, so repeated set and dict lookups are O(1)."""
+        return repr(self)
+
+    @cached_property
+    def _structure(self) -> tuple:
+        """The type of this node followed by the structures of its operands. Unlike the repr, two 
+        structures are only equal for syntactically identical trees, so they can key memo tables."""
+        return (type(self), *(
+            operand._structure if isinstance(operand, Expression) else operand for operand in self.operands()
+        ))
 
     def __gt__(self, other):
         return not (self < other) and not (self == other)
@@ -120,6 +158,10 @@ class Expression:
         other = convert_primitive(other)
         return (other % self) if isinstance(other, Expression) else NotImplemented
 
+def _operand_repr(operand) -> str:
+    """repr of an operand, reusing its cached string so that a new node does not re-render its subtrees."""
+    return operand._repr if isinstance(operand, Expression) else repr(operand)
+
 class Sum(Expression):
     """Sums represent the sum of two or more terms."""
 
@@ -127,7 +169,7 @@ class Sum(Expression):
         self.terms = list(terms)
 
     def __repr__(self):
-        term_repr = [repr(term) for term in self.terms[::-1]]
+        term_repr = [_operand_repr(term) for term in self.terms[::-1]]
         return "(" + " + ".join(term_repr) + ")"
     
     def __str__(self):
@@ -177,6 +219,10 @@ class Sum(Expression):
     def operands(self):
         return self.terms
 
+    @cached_property
+    def poly_vars(self) -> frozenset:
+        return frozenset().union(*(term.poly_vars for term in self.terms))
+
 class Product(Expression):
     """Products represent a product of two or more factors"""
 
@@ -189,7 +235,7 @@ class Product(Expression):
                 return "-" + repr(self.factors[1])
             return f"{self.factors[0]}{self.factors[1]}" #Implicit multiplication is easier on the eyes
         
-        factor_repr = [repr(factor) for factor in self.factors]
+        factor_repr = [_operand_repr(factor) for factor in self.factors]
         return "(" + " \u00B7 ".join(factor_repr) + ")" #\u00b7 -> (•)
 
     def __str__(self):
@@ -241,11 +287,23 @@ class Product(Expression):
 
     def operands(self):
         return self.factors
+
+    @cached_property
+    def poly_vars(self) -> frozenset:
+        return frozenset().union(*(factor.poly_vars for factor in self.factors))
     
     def coefficient(self):
         return self.factors[0] if isinstance(self.factors[0], Constant) else Integer(1)
     
     def term(self):
+        return self._term
+
+    @cached_property
+    def _term(self):
+        """The non-constant part of the product, split off once per node.
+        
+        Sum simplification compares terms pairwise, so term() is requested many times per product.
+        """
         if not isinstance(self.factors[0], Constant):
             return self
         
@@ -254,13 +312,18 @@ class Product(Expression):
         
         return Product(*self.factors[1::])
     
-    def num(self):
+    @cached_property
+    def _num_denom(self):
+        """The pair (numerator, denominator), computed once per node since each requires a division"""
         first_factor = self.factors[0]
-        return first_factor.num() * (self / first_factor).num()
+        remaining = self / first_factor
+        return first_factor.num() * remaining.num(), first_factor.denom() * remaining.denom()
+
+    def num(self):
+        return self._num_denom[0]
     
     def denom(self):
-        first_factor = self.factors[0]
-        return first_factor.denom() * (self / first_factor).denom()
+        return self._num_denom[1]
 
     def __mul__(self, other):
         if isinstance(other, Product):
@@ -355,10 +418,21 @@ class Power(Expression):
         
     def denom(self):
         if isinstance(self.right, Constant) and self.right.eval() < 0:
-            return self.left ** (-1 * self.right)
+            return self._inverse
         else:
             return Integer(1)
 
+    @cached_property
+    def poly_vars(self) -> frozenset:
+        if isinstance(self.right, Integer) and Integer(1) < self.right:
+            return frozenset((self.left,))
+        return frozenset((self,))
+
+    @cached_property
+    def _inverse(self):
+        """base ^ -exponent, built once per node"""
+        return self.left ** (-1 * self.right)
+
 class Factorial(Expression):
     """A Factorial represents the factorial of a number"""
 
@@ -390,6 +464,9 @@ class Factorial(Expression):
 
 #=============== SYMBOLS ===============
 
+"""Table of interned Variables, keyed by name"""
+_VARIABLES = WeakValueDictionary()
+
 class Variable(Expression):
     """A Variable represents a symbolic value. 
     
@@ -397,10 +474,30 @@ class Variable(Expression):
     substitution of these values with constants or other expressions.
     """
 
+    def __new__(cls, name: str):
+        """Variables are interned by name, so that equal variables are the same object."""
+        instance = _VARIABLES.get(name)
+        if instance is None:
+            instance = super().__new__(cls)
+            _VARIABLES[name] = instance
+        return instance
+
     def __init__(self, name: str):
         """Create a new Variable object"""
         self.name = name
 
+    def __reduce__(self):
+        """Copies and unpickled Variables resolve to the interned instance."""
+        return (type(self), (self.name,))
+
+    def __eq__(self, other):
+        if isinstance(other, Variable):
+            return self is other
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return hash(self.name)
+
     def __repr__(self) -> str:
         """Return the name of the variable"""
         return self.name
@@ -414,6 +511,10 @@ class Variable(Expression):
     def operands(self):
         return [self.name]
 
+    @cached_property
+    def free_vars(self) -> frozenset:
+        return frozenset((self,))
+
 class Elementary(Expression):
     """Elementary is the base class for all named elementary function implementations in LevyCAS.
 
@@ -448,7 +549,7 @@ class Elementary(Expression):
         return NotImplemented
 
     def __repr__(self):
-        args_repr = "(" + ", ".join([repr(arg) for arg in self.args]) + ")"
+        args_repr = "(" + ", ".join([_operand_repr(arg) for arg in self.args]) + ")"
         return type(self).__name__ + args_repr
         
     def __str__(self):
@@ -538,12 +639,23 @@ class Constant(Expression):
     
     Expressions consisting of only Constant atoms are rational expression."""
 
+    #Constants are already simplified, so simplify never has to flag them
+    _simplified = True
+
     def coefficient(self):
         return self
     
     def term(self):
         return Integer(1)
 
+    @property
+    def free_vars(self) -> frozenset:
+        return frozenset()
+
+    @property
+    def poly_vars(self) -> frozenset:
+        return frozenset()
+
     def __lt__(self, other):
         """Total ordering for Constants: O-1"""
         if isinstance(other, Constant):
@@ -636,8 +748,7 @@ class Rational(Constant):
         if n % d == 0:
             return Integer(n // d)
 
-        from ..operations import gcd
-        g = int(gcd(n, d))
+        g = gcd(n, d)
         if  d > 0:
             new_instance.left = n // g
             new_instance.right = d // g
@@ -728,14 +839,33 @@ class Rational(Constant):
     def __float__(self) -> float:
         return self.eval()
 
+"""Table of interned small Integers, keyed by value. These instances are shared by every caller, so 
+nothing but their value and the immutable properties derived from it is ever stored on them"""
+_SMALL_INTEGERS = {}
+
 class Integer(Constant):
     """Integers are boxed ints. The wrapper facilitates simplification and 
     algebraic routines that require type checking."""
 
+    def __new__(cls, value: int):
+        """Small Integers (such as 0 and 1) are interned, so that the many 
+        constants built by the algebraic routines share one object."""
+        if type(value) is not int or not -8 <= value <= 256:
+            return super().__new__(cls)
+        instance = _SMALL_INTEGERS.get(value)
+        if instance is None:
+            instance = super().__new__(cls)
+            _SMALL_INTEGERS[value] = instance
+        return instance
+
     def __init__(self, value: int):
         """Creates a new Integer object"""
         self.value = value
 
+    def __reduce__(self):
+        """Copies and unpickled Integers are rebuilt from their value, so small ones stay interned."""
+        return (type(self), (self.value,))
+
     def __repr__(self):
         """Returns the value of the integer"""
         return repr(self.value)
@@ -857,13 +987,18 @@ class Integer(Constant):
 
 #============== METHODS =================
 
-@cache
 def convert_primitive(num: Number | str) -> Constant:
     """Parse a native number into a LevyCAS Constant (in lowest terms).
     
     Takes advantage of the quick Fraction constructor from `fractions`.
     """
     if num is UNDEFINED or isinstance(num, Expression): return num
+    return _convert_number(num)
+
+@cache
+def _convert_number(num: Number | str) -> Constant:
+    """Cached convert_primitive for native numbers. Expressions are never cached here, since their 
+    equality compares reprs, and distinct trees can share a repr."""
     if isinstance(num, int): return Integer(num)
     try:
         as_frac = Fraction(num).limit_denominator()
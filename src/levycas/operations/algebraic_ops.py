@@ -3,6 +3,7 @@
 
 from ..expressions import *
 from .expression_ops import construct, contains
+from .simplification_ops import simplify_sum
 
 def algebraic_expand(expr: Expression) -> Expression:
     """Given an expression, returns an equivalent expression in expanded form.
@@ -14,6 +15,40 @@ def algebraic_expand(expr: Expression) -> Expression:
     Returns:
         Expression: The expanded expression
     """
+    expanded = _algebraic_expand(expr)
+    _flag_simplified(expanded)
+    return expanded
+
+def _flag_simplified(expr: Expression):
+    """Flags an expansion and its sub-expressions the way simplify() flags its results. Expansions are 
+    rebuilt from simplified operands by the automatic simplifiers, so their nodes are simplified once their 
+    operands are. construct() builds Div and Factorial nodes as they are, though, so those nodes and every 
+    node above them are left unflagged. The walk stops at nodes that are already flagged."""
+    #Iterative post-order walk, recording whether each node (by id) is simplified
+    simplified = {}
+    stack = [(expr, False)]
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            if id(node) in simplified:
+                continue
+            if isinstance(node, Variable) or (isinstance(node, Expression) and node._simplified):
+                simplified[id(node)] = True
+            elif not isinstance(node, Expression) or isinstance(node, (Div, Factorial)):
+                simplified[id(node)] = False
+            else:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in node.operands())
+            continue
+
+        if all(simplified[id(operand)] for operand in node.operands()):
+            node._simplified = True
+            simplified[id(node)] = True
+        else:
+            simplified[id(node)] = False
+
+def _algebraic_expand(expr: Expression) -> Expression:
+    """Unflagged algebraic_expand."""
     if not isinstance(expr, Expression):
         return expr
 
@@ -24,22 +59,56 @@ def algebraic_expand(expr: Expression) -> Expression:
     operands = expr.operands()
     if operation == Sum:
         expanded_operands = [algebraic_expand(operand) for operand in operands]
+        if expr._simplified and _all_unchanged(expanded_operands, operands):
+            return expr
         return sum(expanded_operands)
 
     elif operation == Product:
+        #A simplified product of expanded factors has nothing left to distribute or recombine, 
+        #unless one of them is a sum or belongs to the denominator. Flagged products hold no raw Div or Factorial
+        expanded_operands = [algebraic_expand(operand) for operand in operands]
+        if expr._simplified and _all_unchanged(expanded_operands, operands) and not any(_is_unexpanded_factor(operand) for operand in operands):
+            return expr
+
         first_factor = operands[0]
         remaining = expr / first_factor
-        new_num = _expand_product(algebraic_expand(first_factor).num(), algebraic_expand(remaining).num())
-        new_denom = _expand_product(algebraic_expand(first_factor).denom(), algebraic_expand(remaining).denom())
+        expanded_first = expanded_operands[0]
+        expanded_remaining = algebraic_expand(remaining)
+        new_num = _expand_product(expanded_first.num(), expanded_remaining.num())
+        new_denom = _expand_product(expanded_first.denom(), expanded_remaining.denom())
 
         return new_num / new_denom
 
     elif operation == Power:
-        return _expand_power(algebraic_expand(operands[0]), algebraic_expand(operands[1]))
+        base, exponent = algebraic_expand(operands[0]), algebraic_expand(operands[1])
+        if expr._simplified and _all_unchanged([base, exponent], operands) and not (type(base) == Sum and isinstance(exponent, Integer)):
+            return expr
+        return _expand_power(base, exponent)
     
     expanded_operands = [algebraic_expand(operand) for operand in operands]
+    if expr._simplified and _all_unchanged(expanded_operands, operands):
+        return expr
     return construct(expanded_operands, operation)
 
+def _all_unchanged(expanded_operands: list[Expression], operands: list[Expression]) -> bool:
+    """Checks whether expanding left every operand as the same object. If the expression is also 
+    flagged by simplify(), rebuilding it would give back an equal expression, so its expansion is the 
+    expression itself. This lets callers detect a no-op expansion by identity. Unflagged expressions 
+    are always rebuilt, which simplifies them.
+    """
+    return all(expanded is operand for expanded, operand in zip(expanded_operands, operands))
+
+def _is_unexpanded_factor(factor: Expression) -> bool:
+    """Checks whether a factor of a product is a sum, a power of a sum, or a power with a 
+    negative exponent. Expanding the product then distributes it or recombines the denominator.
+    """
+    if type(factor) == Sum:
+        return True
+    if type(factor) == Power:
+        exponent = factor.exponent()
+        return type(factor.base()) == Sum or (isinstance(exponent, Constant) and exponent.is_negative())
+    return False
+
 def algebraic_expand_main(expr: Expression) -> Expression:
     """Given an expression, returns an expanded expression that is expanded only with respect
     to the root operation of the AST.
@@ -87,16 +156,31 @@ def _expand_product(r: Expression, s: Expression) -> Sum | Product:
     """
     r_op = type(r)
     s_op = type(s)
+
+    #Numeric fast paths; num()/denom() may hand us raw ints as well as Integers
+    if r_op is Integer or r_op is int:
+        if r == 0:
+            return Integer(0)
+        if s_op is Integer or s_op is int:
+            return Integer(int(r) * int(s))
+        if r == 1:
+            return s
+    elif s_op is Integer or s_op is int:
+        if s == 0:
+            return Integer(0)
+        if s == 1:
+            return r
+
     if r_op == Sum:
-        f = r.operands()[0]
-        return _expand_product(f, s) + _expand_product(r - f, s)
+        # Distribute s over every term of r, then combine the products in a single simplification
+        return simplify_sum(Sum(*(_expand_product(term, s) for term in r.operands())))
         
     elif s_op == Sum:
         return _expand_product(s, r)
 
     return r * s
 
-def _expand_power(u: Expression, int_exp: Integer) -> Sum | Power:
+def _expand_power(u: Expression, int_exp: Integer, powers: dict[tuple[Expression, int], Expression] | None = None) -> Sum | Power:
     """Expanded a power of the form u ^ n, where n is an integer >= 2, using 
     the binomial theorem. 
     If the base is not a sum, then the product u ^ n is returned unchanged.
@@ -104,11 +188,15 @@ def _expand_power(u: Expression, int_exp: Integer) -> Sum | Power:
     Args:
         u (Expression): Base of the power
         int_exp (Integer): Integer exponent (n)
+        powers (dict[tuple[Expression, int], Expression], optional): Expanded powers of the tails of
+            the base, shared by the recursive calls of one expansion so each is only expanded once.
 
     Returns:
         Sum | Power: Expanded power
     """
-    from math import comb
+    if isinstance(u, Constant):
+        return u ** int_exp
+
     if isinstance(int_exp, Integer):
         if int_exp < 0:
             return 1 / algebraic_expand(u ** -int_exp)
@@ -118,13 +206,22 @@ def _expand_power(u: Expression, int_exp: Integer) -> Sum | Power:
             return u
         elif type(u) == Sum:
             n = int_exp.eval()
-            f = u.operands()[0]
-            r = u - f
-            s = 0
+            terms = u.operands()
+            f = terms[0]
+            # The remaining terms are still in canonical order, no need to subtract f
+            r = terms[1] if len(terms) == 2 else Sum(*terms[1:])
+            if powers is None:
+                powers = {}
+            expanded_terms = []
+            c = 1
             for k in range(0, n + 1):
-                c = comb(n, k)
-                s += _expand_product(c * f ** (n - k), _expand_power(r, Integer(k)))
-            return s
+                r_power = powers.get((r, k))
+                if r_power is None:
+                    r_power = powers[(r, k)] = _expand_power(r, Integer(k), powers)
+                expanded_terms.append(_expand_product(c * f ** (n - k), r_power))
+                # comb(n, k + 1) from comb(n, k)
+                c = c * (n - k) // (k + 1)
+            return simplify_sum(Sum(*expanded_terms))
     
     return u ** int_exp
 
@@ -143,19 +240,15 @@ def rationalize(expr: Expression) -> Expression:
     if operation == Power:
         return rationalize(operands[0]) ** operands[1]
     elif operation == Product:
-        first_factor = rationalize(operands[0])
-        if len(operands) == 1:
-            return first_factor
-        else:
-            remaining_factor = rationalize(Product(*operands[1::]))
-            return first_factor * remaining_factor
+        rationalized = rationalize(operands[0])
+        for factor in operands[1:]:
+            rationalized *= rationalize(factor)
+        return rationalized
     elif operation == Sum:
-        first_term = rationalize(operands[0])
-        if len(operands) == 1:
-            return first_term
-        else:
-            remaining_term = rationalize(Sum(*operands[1::]))
-            return _rationalize_sum(first_term, remaining_term)
+        rationalized = rationalize(operands[0])
+        for term in operands[1:]:
+            rationalized = _rationalize_sum(rationalized, rationalize(term))
+        return rationalized
     else:
         return expr
 
@@ -164,11 +257,11 @@ def _rationalize_sum(first_term: Expression, second_term: Expression) -> Express
     (ms + nr)/sr
 
     Args:
-        first_term (Expression): _description_
-        second_term (Expression): _description_
+        first_term (Expression): The first term, m/r
+        second_term (Expression): The second term, n/s
 
     Returns:
-        Expression: _description_
+        Expression: The rationalized sum (ms + nr)/sr
     """
     m = first_term.num()
     r = first_term.denom()
@@ -176,8 +269,7 @@ def _rationalize_sum(first_term: Expression, second_term: Expression) -> Express
     s = second_term.denom()
     if r == 1 and s == 1:
         return first_term + second_term
-    else:
-        return _rationalize_sum(m * s, n * r) / (r * s)
+    return (m * s + n * r) / (r * s)
 
 def linear_form(expr: Expression, wrt: Variable) -> list[Expression] | None:
     """Checks if the given expression is of the form
@@ -1,7 +1,7 @@
 """Methods acting on an expression's AST. These are calculus operations."""
 
 from ..expressions import *
-from .expression_ops import contains, substitute
+from .expression_ops import contains, substitute, common_subexpressions
 from .algebraic_ops import algebraic_expand, linear_form, quadratic_form
 from .polynomial_ops import (
     is_polynomial, 
@@ -12,18 +12,67 @@ from .polynomial_ops import (
     coefficient,
     _solve_linear_system,
 )
+from .simplification_ops import simplify_sum
 from .trig_ops import trig_simplify
 
-from typing import Literal
+from typing import Callable, Iterator, Literal
+import threading
 from numbers import Number
+from fractions import Fraction
 
 """Max recursive depth for relevant routines (e.g. limit)"""
 _MAX_DEPTH = 10
 
+"""Memoized integrals for the outermost running call to `integrate` in each thread. The `cache` 
+attribute is a dict while a call is running, and missing when the thread is idle"""
+_integral_state = threading.local()
+
+"""Table of known integrals, especially containing elementary functions. Uses anonymous variable x"""
+_X = Variable("x")
+INTEGRAL_TABLE = {
+    _X               : (1/2)*_X**2,
+    1/_X             : Ln(_X),
+    Exp(_X)          : Exp(_X),
+    Ln(_X)           : _X * Ln(_X) - _X,
+    Cos(_X)          : Sin(_X),
+    Sin(_X)          : -Cos(_X),
+    Sec(_X)**2       : Tan(_X),
+    Sec(_X)*Tan(_X)  : Sec(_X),
+    -Csc(_X)**2      : Cot(_X),
+    -Csc(_X)*Cot(_X) : Csc(_X),
+}
+
+"""Root operations of the integral table entries"""
+_INTEGRAL_TABLE_OPERATIONS = frozenset(type(integrand) for integrand in INTEGRAL_TABLE)
+
 class Deriv(Elementary):
     """Anonymous derivative class"""
     pass
 
+class _DerivativeCache:
+    """Derivatives computed during one top-level call to `derivative`. Sub-trees of the original 
+    expression are keyed by their common sub-expression number, so that equal sub-trees are derived 
+    once without being hashed; any other expression falls back to its structure, since equal reprs 
+    do not imply equal trees.
+    """
+    def __init__(self, expr: Expression):
+        self.numbers = common_subexpressions(expr)
+        self.numbered = {}
+        self.structural = {}
+
+    def get(self, expr: Expression) -> Expression | None:
+        number = self.numbers.get(id(expr))
+        if number is None:
+            return self.structural.get(expr._structure)
+        return self.numbered.get(number)
+
+    def set(self, expr: Expression, derived: Expression):
+        number = self.numbers.get(id(expr))
+        if number is None:
+            self.structural[expr._structure] = derived
+        else:
+            self.numbered[number] = derived
+
 def derivative(expr: Expression, wrt: Variable) -> Expression:
     """Recursively computed derivative.
 
@@ -34,82 +83,117 @@ def derivative(expr: Expression, wrt: Variable) -> Expression:
     Returns:
         Expression: The computed derivative
     """
-    
-    operation = type(expr)
-    operands = expr.operands()
-
-    if expr == wrt:
-        return Integer(1)
-
-    elif operation == Power:
-        v = expr.base()
-        w = expr.exponent()
-        lhs = w * v ** (w - 1) * derivative(v, wrt)
-        rhs = derivative(w, wrt) * v ** w * Ln(v)
-        return (lhs + rhs)
-
-    elif operation == Sum:
-        derived_operands = [derivative(operand, wrt) for operand in operands]
-        return sum(derived_operands)
-
-    elif operation == Product:
-        if len(operands) == 1:
-            return derivative(operands[0], wrt)
-        
-        v = operands[0]
-        w = expr / v
-        return (derivative(v, wrt) * w + v * derivative(w, wrt))
+    return _derivative_recursive(expr, wrt, _DerivativeCache(expr))
 
-    elif isinstance(expr, Elementary):
-        arg = operands[0]
-        arg_deriv = derivative(arg, wrt)
+def _derivative_recursive(expr: Expression, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    """Memoized derivative. The cache holds the sub-expressions already derived during the current
+    top-level call to `derivative`, so shared sub-trees are derived once.
 
-        if operation == Deriv:
-            return Deriv(expr, wrt) * arg_deriv
-
-        elif operation == Exp:
-            return (arg_deriv * expr)
-
-        elif operation == Ln:
-            return (arg_deriv / arg)
-
-        elif operation == Sin:
-            return (Cos(arg) * arg_deriv)
-
-        elif operation == Cos:
-            return (-1 * Sin(arg) * arg_deriv)
-
-        elif operation == Tan:
-            return (Sec(arg)**2 * arg_deriv)
+    Args:
+        expr (Expression): The expression to derivate
+        wrt (Variable): The variable to take the derivative with respect to
+        cache (_DerivativeCache): Derivatives computed so far in this call
 
-        elif operation == Sec:
-            return Sec(arg) * Tan(arg) * arg_deriv
-        
-        elif operation == Csc:
-            return -Cot(arg) * Csc(arg) * arg_deriv
-        
-        elif operation == Cot:
-            return -Csc(arg)**2 * arg_deriv
+    Returns:
+        Expression: The computed derivative
+    """
+    if isinstance(wrt, Variable) and wrt not in expr.free_vars:
+        return Integer(0)
 
-        elif operation == Arccos:
-            return -arg_deriv / (1 - arg**2)**(1 / 2)
+    derived = cache.get(expr)
+    if derived is None:
+        derived = _derivative_rules(expr, wrt, cache)
+        cache.set(expr, derived)
+    return derived
 
-        elif operation == Arcsin:
-            return arg_deriv / (1 - arg**2)**(1 / 2)
+def _derivative_rules(expr: Expression, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    """Applies the differentiation rule matching the root operation of expr."""
+    if expr == wrt:
+        return Integer(1)
 
-        elif operation == Arctan:
-            return arg_deriv / (1 + arg**2)
+    rule = _DERIVATIVE_RULES.get(type(expr))
+    if rule is not None:
+        return rule(expr, wrt, cache)
 
-    else:
-        if not contains(expr, wrt):
-            return Integer(0)
+    if not contains(expr, wrt):
+        return Integer(0)
 
-        return Deriv(expr, wrt)
+    return Deriv(expr, wrt)
+
+def _derivative_power(expr: Power, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    v = expr.base()
+    w = expr.exponent()
+    dv, dw = _derivative_recursive(v, wrt, cache), _derivative_recursive(w, wrt, cache)
+    # Only build the terms of (w * v^(w-1) * v') + (w' * v^w * Ln(v)) that are non-zero; v^w is expr itself
+    lhs = Integer(0) if dv == 0 else w * v ** (w - 1) * dv
+    if dw == 0:
+        return lhs
+    rhs = dw * expr * Ln(v)
+    return (lhs + rhs)
+
+def _derivative_sum(expr: Sum, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    derived_operands = [_derivative_recursive(operand, wrt, cache) for operand in expr.operands()]
+    derived_operands = [derived for derived in derived_operands if derived != 0]
+    if len(derived_operands) <= 1:
+        return derived_operands[0] if derived_operands else Integer(0)
+    # Combine all of the derived terms in a single simplification instead of one per addition
+    return simplify_sum(Sum(*derived_operands))
+
+def _derivative_product(expr: Product, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    operands = expr.operands()
+    if len(operands) == 1:
+        return _derivative_recursive(operands[0], wrt, cache)
+
+    # The remaining factors are already in canonical order, so there
+    # is no need to divide (and re-simplify) to split off v.
+    v = operands[0]
+    w = _product_of(operands[1:])
+    dv, dw = _derivative_recursive(v, wrt, cache), _derivative_recursive(w, wrt, cache)
+    if dv == 0:
+        return v * dw
+    if dw == 0:
+        return dv * w
+    return (dv * w + v * dw)
+
+def _derivative_deriv(expr: Deriv, wrt: Variable, cache: _DerivativeCache) -> Expression:
+    arg_deriv = _derivative_recursive(expr.operands()[0], wrt, cache)
+    return Deriv(expr, wrt) * arg_deriv
+
+def _chain_rule(outer: Callable[[Elementary, Expression, Expression], Expression]) -> Callable:
+    """Given outer(expr, arg, arg_deriv), which returns the derivative of an elementary function 
+    f(arg) given the derivative of its argument, returns the corresponding derivative rule.
+    """
+    def rule(expr: Elementary, wrt: Variable, cache: _DerivativeCache) -> Expression:
+        arg = expr.operands()[0]
+        return outer(expr, arg, _derivative_recursive(arg, wrt, cache))
+    return rule
+
+"""Differentiation rules, keyed by the root operation of the expression"""
+_DERIVATIVE_RULES = {
+    Power   : _derivative_power,
+    Sum     : _derivative_sum,
+    Product : _derivative_product,
+    Deriv   : _derivative_deriv,
+    Exp     : _chain_rule(lambda expr, arg, arg_deriv: (arg_deriv * expr)),
+    Ln      : _chain_rule(lambda expr, arg, arg_deriv: (arg_deriv / arg)),
+    Sin     : _chain_rule(lambda expr, arg, arg_deriv: (Cos(arg) * arg_deriv)),
+    Cos     : _chain_rule(lambda expr, arg, arg_deriv: (-1 * Sin(arg) * arg_deriv)),
+    Tan     : _chain_rule(lambda expr, arg, arg_deriv: (Sec(arg)**2 * arg_deriv)),
+    Sec     : _chain_rule(lambda expr, arg, arg_deriv: Sec(arg) * Tan(arg) * arg_deriv),
+    Csc     : _chain_rule(lambda expr, arg, arg_deriv: -Cot(arg) * Csc(arg) * arg_deriv),
+    Cot     : _chain_rule(lambda expr, arg, arg_deriv: -Csc(arg)**2 * arg_deriv),
+    Arccos  : _chain_rule(lambda expr, arg, arg_deriv: -arg_deriv / (1 - arg**2)**(1 / 2)),
+    Arcsin  : _chain_rule(lambda expr, arg, arg_deriv: arg_deriv / (1 - arg**2)**(1 / 2)),
+    Arctan  : _chain_rule(lambda expr, arg, arg_deriv: arg_deriv / (1 + arg**2)),
+}
 
 def integrate(expr: Expression, wrt: Variable) -> Expression | None:
     """Attempts to symbolically integrate the given expression with respect 
     to the given variable. If the operation fails, returns None. 
 
+    Integrals (and failures) are memoized for the duration of the outermost call, since
+    the integration strategies retry the same sub-integrals (e.g. after expansion).
+
     Args:
         expr (Expression): The expression to integrate.
         wrt (Variable): The variable to integrate with respect to.
@@ -119,6 +203,26 @@ def integrate(expr: Expression, wrt: Variable) -> Expression | None:
     """
     assert isinstance(wrt, Variable), f"Cannot integrate with respect to {wrt}"
 
+    cache = getattr(_integral_state, "cache", None)
+    if cache is None:
+        _integral_state.cache = {}
+        try:
+            return integrate(expr, wrt)
+        finally:
+            del _integral_state.cache
+
+    #Keyed by structure rather than by the repr-based equality, which can match different trees
+    key = (expr._structure if isinstance(expr, Expression) else expr, wrt._structure)
+    if key in cache:
+        return cache[key]
+
+    # Re-entering an integral that is still being computed would recurse forever; fail instead.
+    cache[key] = None
+    integrated = cache[key] = _integrate(expr, wrt)
+    return integrated
+
+def _integrate(expr: Expression, wrt: Variable) -> Expression | None:
+    """Tries each integration strategy in turn. See `integrate`."""
     integrated = _integrate_match(expr, wrt)
 
     if integrated is None:
@@ -134,6 +238,8 @@ def integrate(expr: Expression, wrt: Variable) -> Expression | None:
         integrated = _integrate_known_byparts(expr, wrt)
 
     if integrated is None:
+        # algebraic_expand hands back a simplified expr itself when there is nothing to expand,
+        #  in which case this comparison is an identity check
         expanded = algebraic_expand(expr)
         if expr != expanded:
             integrated = integrate(expanded, wrt)
@@ -156,8 +262,6 @@ def _integrate_match(expr: Expression, wrt: Variable) -> Expression | None:
     Returns:
         Expression | None: The integrated expression, or None if the integration fails.
     """
-    from .simplification_ops import sym_eval
-
     if expr == 0:
         return Integer(0)
 
@@ -173,27 +277,17 @@ def _integrate_match(expr: Expression, wrt: Variable) -> Expression | None:
         elif not contains(base, wrt) and exponent == wrt:
             return base ** wrt / Ln(base)
 
-    """Table of known integrals, especially containing elementary functions. Uses anonymous variable x"""
-    X = Variable("x")
-    INTEGRAL_TABLE = {
-        X              : (1/2)*X**2,   
-        1/X            : Ln(X),        
-        Exp(X)         : Exp(X),       
-        Ln(X)          : X * Ln(X) - X,
-        Cos(X)         : Sin(X),       
-        Sin(X)         : -Cos(X),      
-        Sec(X)**2      : Tan(X),       
-        Sec(X)*Tan(X)  : Sec(X),       
-        -Csc(X)**2     : Cot(X),       
-        -Csc(X)*Cot(X) : Csc(X),       
-    }
-
-    substitution = {str(wrt) : Variable('x')}
-    test_expr = sym_eval(expr, **substitution)
+    # Every table entry is an expression in x alone, so only expressions in wrt alone 
+    #  can match one. Requiring exactly {wrt} also guarantees that renaming wrt -> x conflates nothing.
+    if type(expr) not in _INTEGRAL_TABLE_OPERATIONS or expr.free_vars != {wrt}:
+        return None
+
+    test_expr = expr if wrt == _X else substitute(expr, wrt, _X)
+
     integrated = INTEGRAL_TABLE.get(test_expr, None)
     if integrated is None:
         return None
-    return substitute(integrated, Variable('x'), wrt)
+    return integrated if wrt == _X else substitute(integrated, _X, wrt)
 
 def _integrate_linear(expr: Expression, wrt: Variable) -> Expression | None:
     """Given an expression, integrates linearly with respect to the given variable.
@@ -215,13 +309,13 @@ def _integrate_linear(expr: Expression, wrt: Variable) -> Expression | None:
         return independent * integral if integral is not None else None
     
     elif isinstance(expr, Sum):
-        integral = 0
+        term_integrals = []
         for term in expr.operands():
             term_integral = integrate(term, wrt)
             if term_integral is None:
                 return None
-            integral += term_integral
-        return integral
+            term_integrals.append(term_integral)
+        return simplify_sum(Sum(*term_integrals))
 
     return None
 
@@ -236,46 +330,52 @@ def _integrate_substitute(expr: Expression, wrt: Variable) -> Expression | None:
     Returns:
         Expression | None: The integrated expression, or None if the integration fails.
     """
-    possible_substitutions = _trial_substitutions(expr)
-    for substitution in possible_substitutions:
-        if substitution != wrt and contains(substitution, wrt):
-            test_expr = substitute(expr / derivative(substitution, wrt), substitution, Variable('v'))
-            if not contains(test_expr, wrt):
-                test_integral = integrate(test_expr, Variable('v'))
-                if test_integral is None:
-                    continue
-                return substitute(test_integral, Variable('v'), substitution)
+    for substitution, substitution_deriv in _trial_substitutions(expr, wrt):
+        test_expr = substitute(expr / substitution_deriv, substitution, Variable('v'))
+        if not contains(test_expr, wrt):
+            test_integral = integrate(test_expr, Variable('v'))
+            if test_integral is None:
+                continue
+            return substitute(test_integral, Variable('v'), substitution)
 
     return None
 
-def _trial_substitutions(expr: Expression) -> set[Expression]:
-    """Given an expression, returns a set of complete sub-expressions
-    that are candidates for u-substitution. These candidates are all 
-    functions, arguments of functions, or bases/exponents of powers.
+def _trial_substitutions(expr: Expression, wrt: Variable) -> Iterator[tuple[Expression, Expression]]:
+    """Given an expression, yields the complete sub-expressions that are candidates 
+    for u-substitution, together with their derivatives. These candidates are all 
+    functions, arguments of functions, or bases/exponents of powers that depend on 
+    (but are not) the variable of integration.
+
+    Candidates are gathered in a single walk of the expression, which skips sub-trees free 
+    of wrt; each derivative is only computed once the caller asks for that candidate.
+    Candidates are tried in sorted order, which keeps the chosen substitution deterministic.
 
     Args:
         expr (Expression): The expression to search through.
+        wrt (Variable): The variable of integration.
 
-    Returns:
-        set[Expression]: Set of complete sub-expression to be used as substitution candidates.
+    Yields:
+        tuple[Expression, Expression]: Pairs (u, du/dwrt), in sorted order of u.
     """
     candidates = set()
-
-    operation = type(expr)
-    if operation in [Integer, Rational, Variable]:
-        return candidates
-
-    if isinstance(expr, Elementary):
-        candidates.add(expr)
-        candidates = candidates.union(set(expr.operands()))
-    elif operation == Power:
-        candidates.add(expr.base())
-        candidates.add(expr.exponent())
-
-    operands = expr.operands()
-    for operand in operands:
-        candidates = candidates.union(_trial_substitutions(operand))
-    return sorted(candidates)
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        operation = type(node)
+        if operation in [Integer, Rational, Variable] or wrt not in node.free_vars:
+            continue
+
+        operands = [operand for operand in node.operands() if wrt in operand.free_vars]
+        if isinstance(node, Elementary):
+            candidates.add(node)
+            candidates.update(operands)
+        elif operation == Power:
+            candidates.update(operands)
+        stack.extend(operands)
+
+    candidates.discard(wrt)
+    for candidate in sorted(candidates):
+        yield candidate, derivative(candidate, wrt)
 
 def _separate_factors(expr: Product, wrt: Variable) -> list[Product | Integer]:
     """Given a product of factors, separates the factors into those independent of the given variable
@@ -289,15 +389,24 @@ def _separate_factors(expr: Product, wrt: Variable) -> list[Product | Integer]:
         list[Product]: The list [independent, dependent]
     """
     independent = Integer(1)
-    dependent = Integer(1)
-
+    dependent = []
     for factor in expr.operands():
-        if contains(factor, wrt):
-            dependent *= factor
+        if wrt in factor.free_vars:
+            dependent.append(factor)
         else:
             independent *= factor
 
-    return [independent, dependent]
+    # The independent side is multiplied up, since a constant distributes over a Sum factor.
+    #  The dependent factors hold no constants, so any subsequence of them is already simplified.
+    return [independent, _product_of(dependent)]
+
+def _product_of(factors: list[Expression]) -> Expression:
+    """Builds the product of non-constant factors taken, in order, from a simplified product."""
+    if not factors:
+        return Integer(1)
+    if len(factors) == 1:
+        return factors[0]
+    return Product(*factors)
 
 def _integrate_rational(expr: Expression, wrt: Variable) -> Expression | None:
     """Given an expression in rational form (P/Q with P, Q polynomials), 
@@ -339,23 +448,26 @@ def _integrate_rational(expr: Expression, wrt: Variable) -> Expression | None:
         # Failed with partial fractions, return 
         #  closed form (which might be uglier).
         a, b, c = quadratic_form(denom, wrt)
-        discriminant = b**2 - 4*a*c
+        discriminant = _discriminant(a, b, c)
         if num == 1:
+            # Every closed form is in terms of the derivative of the denominator, 2ax + b
+            denom_deriv = 2*a*wrt + b
             if not isinstance(discriminant, Integer) or discriminant < 0:
                 sqrt_nd = (-discriminant)**(1/2)
-                return 2 * Arctan((2*a*wrt + b)/sqrt_nd) / sqrt_nd
+                return 2 * Arctan(denom_deriv / sqrt_nd) / sqrt_nd
             if discriminant == 0:
-                return -2 / (2*a*wrt + b)
+                return -2 / denom_deriv
             elif discriminant.is_positive():
                 # Arctanh form uses Ln expansion.
                 #  assumes complex logarithm until Abs() implemented.
                 sqrt_d = discriminant ** (1/2)
-                return -1 / sqrt_d * Ln((1 + (2*a*wrt + b) / sqrt_d)/(1 - (2*a*wrt + b) / sqrt_d))
+                ratio = denom_deriv / sqrt_d
+                return -1 / sqrt_d * Ln((1 + ratio)/(1 - ratio))
 
         elif num_degree == 1:
             r, s = linear_form(num, wrt)
             alpha = r / (2*a)
-            beta = s - r*b/(2*a)
+            beta = s - alpha*b
             #Correction from Elementary Algorithms, beta -> 1/beta
             factor = integrate(1 / denom, wrt)
             return None if factor is None else alpha*Ln(denom) + beta * factor
@@ -366,6 +478,18 @@ def _integrate_rational(expr: Expression, wrt: Variable) -> Expression | None:
     #  try partial fractions
     return _integrate_partial(num, denom, wrt)
 
+def _discriminant(a: Expression, b: Expression, c: Expression) -> Expression:
+    """Computes the discriminant b^2 - 4ac of the quadratic ax^2 + bx + c. 
+    
+    When all coefficients are rational constants (the usual case), this is done with native
+    fractions and wrapped into a LevyCAS Constant once, instead of through Expression arithmetic.
+    """
+    if isinstance(a, Constant) and isinstance(b, Constant) and isinstance(c, Constant):
+        a, b, c = (Fraction(coeff.num(), coeff.denom()) for coeff in (a, b, c))
+        discriminant = b * b - 4 * a * c
+        return Rational(discriminant.numerator, discriminant.denominator)
+    return b**2 - 4*a*c
+
 def _hermite_reduce(P: Expression, Q: Expression, x: Expression) -> Expression | None:
     """Uses Hermite's method to reduce the integral p/q in x.
 
@@ -42,15 +42,8 @@ def get_symbols(expr: Expression) -> set[Variable]:
     """
     if not isinstance(expr, Expression):
         return set()
-    if isinstance(expr, Constant):
-        return set()
-    elif isinstance(expr, Variable):
-        return {expr,}
-    else:
-        syms = set()
-        for operand in expr.operands():
-            syms = syms.union(get_symbols(operand))
-        return syms
+    #Copied, since the cached free variables are shared by every caller
+    return set(expr.free_vars)
 
 def contains(expr: Expression, subs: Expression | set[Expression]) -> bool:
     """Checks whether the given expression contains any of the given
@@ -70,44 +63,102 @@ def contains(expr: Expression, subs: Expression | set[Expression]) -> bool:
     False
     """
     subs = {subs} if isinstance(subs, Expression) else subs
-    if expr in subs:
-        return True
-    else:
-        if not isinstance(expr, Expression):
-            return False
-
-        for operand in expr.operands():
-            #The following case covers terminal expressions
-            #i.e, the operand of Variable('x') is the string 'x'
-            if not isinstance(operand, Expression):
-                return False
-            if contains(operand, subs):
-                return True
-        return False
+
+    #Containment of variables is answered by the cached set of free variables
+    if isinstance(expr, Expression) and all(isinstance(sub, Variable) for sub in subs):
+        return not expr.free_vars.isdisjoint(subs)
+
+    #Iterative depth-first search; sub-trees shared between operands are only visited once
+    stack = [expr]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        if node in subs:
+            return True
+
+        #Terminal expressions have non-expression operands,
+        #i.e, the operand of Variable('x') is the string 'x'
+        if isinstance(node, Expression):
+            stack.extend(operand for operand in node.operands() if isinstance(operand, Expression))
+    return False
 
 def copy_expr(expr: Expression) -> Expression:
     """Creates a copy of the given expression.
+
+    Compound nodes are rebuilt, but interned atoms (Variables and small Integers) 
+    are shared with the original rather than copied.
     
     Args:
         expr (Expression): Expression to copy.
 
     Returns:
-        Expression: Copied expression.
+        Expression: Copied expression; a distinct object unless expr is an interned atom.
 
     Examples:
-    >>> x = Variable('x')
-    >>> x == copy(x)
+    >>> expr = Variable('x') + 1
+    >>> expr == copy_expr(expr)
     True
-    >>> x is copy(x)
+    >>> expr is copy_expr(expr)
     False
     """
-    copied_operands = []
-    for operand in expr.operands():
-        if isinstance(operand, Expression):
-            copied_operands.append(copy_expr(operand))
-        else:
-            copied_operands.append(operand)
-    return type(expr)(*copied_operands)
+    #Iterative post-order walk: a node is rebuilt once all of its operands have been copied
+    stack = [(expr, False)]
+    results = []
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            stack.append((node, True))
+            stack.extend((operand, False) for operand in reversed(node.operands()) if isinstance(operand, Expression))
+            continue
+
+        operands = node.operands()
+        num_copied = sum(isinstance(operand, Expression) for operand in operands)
+        copied = iter(results[len(results) - num_copied:])
+        del results[len(results) - num_copied:]
+        copied_operands = [next(copied) if isinstance(operand, Expression) else operand for operand in operands]
+        results.append(type(node)(*copied_operands))
+    return results[0]
+
+def common_subexpressions(expr: Expression) -> dict[int, int]:
+    """Numbers the sub-expressions of an expression such that structurally equal sub-trees 
+    share a number, without computing the repr of any compound node.
+
+    Example:
+        >>> expr = Sin(x) + Sin(x) * y
+        >>> numbers = common_subexpressions(expr)
+        >>> numbers[id(expr.operands()[0])] == numbers[id(expr.operands()[1].operands()[0])]
+        True
+
+    Args:
+        expr (Expression): The expression to number.
+
+    Returns:
+        dict[int, int]: Maps the id of every node in expr to the number of its structure.
+    """
+    numbers = {}
+    structures = {}
+    stack = [(expr, False)]
+    while stack:
+        node, visited = stack.pop()
+        if id(node) in numbers:
+            continue
+
+        operands = node.operands()
+        if not visited:
+            stack.append((node, True))
+            stack.extend((operand, False) for operand in operands if isinstance(operand, Expression))
+            continue
+
+        #A node's structure is its operation together with the numbers of its operands
+        structure = (type(node), tuple(
+            numbers[id(operand)] if isinstance(operand, Expression) else operand for operand in operands
+        ))
+        numbers[id(node)] = structures.setdefault(structure, len(structures))
+    return numbers
 
 def map_op(expr: Expression, op: Callable) -> Expression:
     """Maps the operator "op" acting on AST's to the arguments of an expression.
@@ -119,27 +170,41 @@ def map_op(expr: Expression, op: Callable) -> Expression:
     Returns:
         Expression: The mapped expression
     """
-    if type(expr) in [Integer, Rational, Variable]:
-        return op(expr)
-    
-    mapped_operators = [map_op(operator, op) for operator in expr.operands()]
-    operation = type(expr)
-    
-    #Special case to force simplification
-    if operation == Sum:
-        return op(sum(mapped_operators))
-    
-    elif operation == Product:
-        prod = 1
-        for mapped_operator in mapped_operators:
-            prod *= mapped_operator
-        return op(prod)
-    
-    elif operation == Power:
-        return op(mapped_operators[0] ** mapped_operators[1])
-    
-    else:
-        return op(operation(*mapped_operators))
+    #Iterative post-order walk: each node is rebuilt from its mapped operands and mapped in the same step
+    stack = [(expr, False)]
+    results = []
+    while stack:
+        node, visited = stack.pop()
+        operation = type(node)
+        if operation in [Integer, Rational, Variable]:
+            results.append(op(node))
+            continue
+
+        operands = node.operands()
+        if not visited:
+            stack.append((node, True))
+            stack.extend((operand, False) for operand in reversed(operands))
+            continue
+
+        mapped_operators = results[len(results) - len(operands):]
+        del results[len(results) - len(operands):]
+
+        #Special case to force simplification
+        if operation == Sum:
+            results.append(op(sum(mapped_operators)))
+        
+        elif operation == Product:
+            prod = 1
+            for mapped_operator in mapped_operators:
+                prod *= mapped_operator
+            results.append(op(prod))
+        
+        elif operation == Power:
+            results.append(op(mapped_operators[0] ** mapped_operators[1]))
+        
+        else:
+            results.append(op(operation(*mapped_operators)))
+    return results[0]
 
 def construct(operands: list[Expression], op: type[Expression]) -> Expression | Literal['UNDEFINED']:
     """Given a list of operands and an operation, 
@@ -202,13 +267,30 @@ def substitute(expr: Expression, sub_expr: Expression, replacement: Expression)
     if not isinstance(expr, Expression):
         return expr
 
-    if expr == sub_expr:
-        return replacement
-    
-    operation = type(expr)
-
-    if operation in [Variable, Integer, Rational]:
-        return expr
-    
-    replaced_operands = [substitute(operand, sub_expr, replacement) for operand in expr.operands()]
-    return construct(replaced_operands, operation)
+    #Iterative post-order walk: every node is rebuilt with construct, so the result is simplified as
+    #before. Flagged nodes (results of simplify and algebraic_expand, never raw Div or Factorial nodes)
+    #are already in that form, and are kept if none of their operands change
+    stack = [(expr, False)]
+    results = []
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            if node == sub_expr:
+                results.append(replacement)
+            elif not isinstance(node, Expression) or type(node) in [Variable, Integer, Rational]:
+                results.append(node)
+            elif node._simplified and isinstance(sub_expr, Variable) and sub_expr not in node.free_vars:
+                results.append(node)
+            else:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in reversed(node.operands()))
+            continue
+
+        num_operands = len(node.operands())
+        replaced_operands = results[len(results) - num_operands:]
+        del results[len(results) - num_operands:]
+        if node._simplified and all(replaced is operand for replaced, operand in zip(replaced_operands, node.operands())):
+            results.append(node)
+        else:
+            results.append(construct(replaced_operands, type(node)))
+    return results[0]
@@ -16,6 +16,7 @@ from .polynomial_ops import (
     polynomial_gcd,
     polynomial_divide,
     polynomial_content,
+    polynomial_extended_gcd_mod_p,
 )
 from .calculus_ops import derivative
 from .numerical_ops import small_primes
@@ -268,29 +269,11 @@ def _symmetric_reduce(f: Expression, x: Variable, modulus: int) -> Expression:
             result = result + Integer(ci) * x**deg_i
     return algebraic_expand(result)
 
-def _extended_gcd_mod_p(
-    a: Expression, b: Expression, x: Variable, p: int
-) -> tuple[Expression, Expression, Expression]:
-    """Extended Euclidean algorithm mod p. Returns (gcd, s, t) with
-    s*a + t*b = gcd (mod p). Does NOT normalize gcd to 1.
-    """
-    r0, r1 = reduce_mod_p(a, x, p), reduce_mod_p(b, x, p)
-    s0, s1 = Integer(1), Integer(0)
-    t0, t1 = Integer(0), Integer(1)
-
-    while r1 != 0:
-        q, r = polynomial_divide_mod_p(r0, r1, x, p)
-        r0, r1 = r1, reduce_mod_p(r, x, p)
-        s0, s1 = s1, reduce_mod_p(algebraic_expand(s0 - q * s1), x, p)
-        t0, t1 = t1, reduce_mod_p(algebraic_expand(t0 - q * t1), x, p)
-
-    return r0, s0, t0
-
 def _bezout_mod_p(
     g0: Expression, h0: Expression, x: Variable, p: int
 ) -> tuple[Expression, Expression]:
     """Returns (s, t) with s*g0 + t*h0 = 1 (mod p), assuming g0, h0 coprime."""
-    gcd_val, s, t = _extended_gcd_mod_p(g0, h0, x, p)
+    gcd_val, s, t = polynomial_extended_gcd_mod_p(g0, h0, x, p)
     inv = mod_inverse(int(gcd_val), p)
     s = reduce_mod_p(algebraic_expand(Integer(inv) * s), x, p)
     t = reduce_mod_p(algebraic_expand(Integer(inv) * t), x, p)
@@ -1,10 +1,11 @@
 """Operations acting on Constants (rationals)."""
+import math
 from functools import cache
 
 from ..expressions import Constant, Integer, Rational, convert_primitive
 
 def gcd(a: Constant, b: Constant) -> Integer:
-    """Computes the greated common divisor of two integers using binary gcd algorithm.
+    """Computes the greated common divisor of two integers, using the builtin math.gcd.
 
     Args:
         a (Integer): First integer
@@ -13,30 +14,15 @@ def gcd(a: Constant, b: Constant) -> Integer:
     Returns:
         Integer: gcd(a, b)
     """
+    if isinstance(a, int) and isinstance(b, int):
+        return Integer(math.gcd(a, b))
+
     a, b = convert_primitive(a), convert_primitive(b)
     
     if isinstance(a, Rational) or isinstance(b, Rational):
         return Integer(1)
     
-    a, b = int(a), int(b)
-    if a == 1 or b == 1:
-        return Integer(1)
-    if a == 0:
-        return abs(b)
-    if b == 0:
-        return abs(a)
-
-    a, a_d = _reduce(abs(a))
-    b, b_d = _reduce(abs(b))
-    d = a_d if a_d < b_d else b_d
-
-    while a != b:
-        if b < a:
-            a = _reduce(a - b)[0]
-        else:
-            b = _reduce(b - a)[0]
-
-    return Integer(2**d * abs(a))
+    return Integer(math.gcd(int(a), int(b)))
 
 def _reduce(a: Integer) -> tuple[Integer]:
     """Helper method to reduce an even number to an odd one,
@@ -49,11 +35,29 @@ def _reduce(a: Integer) -> tuple[Integer]:
         tuple[Integer]: (a', d) where a' and d are such that a' = a/2**d
     """
     a = int(a)
-    d = 0
-    while a % 2 == 0:
-        d += 1
-        a //= 2
-    return a, d
+    #The lowest set bit of a is a & -a, so its position is the number of trailing zeros
+    d = (a & -a).bit_length() - 1
+    return a >> d, d
+
+def _sieve(limit: int) -> tuple[int]:
+    """Sieve of Eratosthenes.
+
+    Args:
+        limit (int): Upper bound (exclusive) on the primes
+
+    Returns:
+        tuple[int]: The primes less than limit, in increasing order
+    """
+    is_composite = bytearray(limit)
+    primes = []
+    for n in range(2, limit):
+        if not is_composite[n]:
+            primes.append(n)
+            is_composite[n * n::n] = b"\x01" * len(range(n * n, limit, n))
+    return tuple(primes)
+
+"""Primes used for trial division in factor_integer, before falling back to Pollard Rho"""
+_TRIAL_PRIMES = _sieve(10000)
 
 def factor_integer(a: Integer | int) -> dict[int, int]:
     """Given an integer, returns a dictionary with key, value pairs (p, m),
@@ -70,6 +74,15 @@ def factor_integer(a: Integer | int) -> dict[int, int]:
     a = int(a)
     
     factors = dict()
+
+    #Strip small prime factors by trial division first; Pollard Rho is slow to find those
+    for p in _TRIAL_PRIMES:
+        if p * p > a:
+            break
+        while a % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            a //= p
+
     while a != 1:
         #Base case
         if is_prime(a):
@@ -93,6 +106,9 @@ def small_primes():
         47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97,
     ]
 
+"""Miller-Rabin bases; testing against these is deterministic for all integers up to 2**64"""
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
 @cache
 def is_prime(n: Integer) -> bool:
     """Primality test for the given integer, implemented only for small
@@ -115,26 +131,27 @@ def is_prime(n: Integer) -> bool:
     if n < 2:
         return False
     
-    #Check manually against first few small primes:
-    SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
-    if n in SMALL_PRIMES:
-        return True
+    #Trial division by the small primes settles most composites before any exponentiation
+    for p in small_primes():
+        if n % p == 0:
+            return n == p
 
     d, s = _reduce(n - 1)
-    for a in SMALL_PRIMES: #Small bases sufficient for ints up to 2^64
+    for a in _MILLER_RABIN_BASES:
         x = pow(a, d, n)
-        for i in range(s):
-            y = pow(x, 2, n)
-            if y == 1 and x != 1 and x != n - 1:
-                return False
-            x = y
-        if x != 1:
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
             return False
     return True
 
-def _pollard_rho(n: Integer, check_prime = False) -> Integer | None:
+def _pollard_rho(n: Integer, check_prime = False) -> int:
     """An implementation of Pollard Rho algorithm for integer factorization.
-    Given an integer a, returns d, a non-trivial divisor of a. 
+    Given an integer n, returns d, a non-trivial divisor of n. 
     
     Based on the starting value, the algorithm may fail to find a divisor.
     In this case, it tries again with a different starting value. If all starting values
@@ -146,7 +163,7 @@ def _pollard_rho(n: Integer, check_prime = False) -> Integer | None:
         n (Integer): The Integer to factor, n > 3
 
     Returns:
-        Integer | None: A non-trivial factor of a.
+        int: A non-trivial factor of n.
     """
     n = int(n)
 
@@ -160,23 +177,55 @@ def _pollard_rho(n: Integer, check_prime = False) -> Integer | None:
     if n % 2 == 0:
         return 2
 
-    b = d = 1
-    x = y = 0
-    g = lambda val: (val ** 2 + b) % n
-
-    for x in range(n):
-        for b in range(1, n - 1):
-            while d == 1:
-                x = g(x)
-                y = g(g(y))
-                d = gcd(abs(x - y), n)
-            if d == n:
-                #Failure, repeat with new parameters
-                d = 1
-                continue
+    for c in range(1, n - 1):
+        d = _pollard_brent(n, c)
+        if d != n:
             return d
+        #Failure, repeat with new parameters
     raise ValueError(f"Could not factor {n} with Pollard's Rho Algorithm")
 
+"""Number of steps of Brent's cycle search whose differences are multiplied together before taking a gcd"""
+_RHO_BATCH = 128
+
+def _pollard_brent(n: int, c: int) -> int:
+    """Brent's variant of Pollard's rho, iterating x -> x^2 + c (mod n). 
+
+    Only one step of the iteration is taken per comparison, and the gcd with n is taken once per
+    batch of differences rather than for each of them. Runs on plain ints, since it is the hot loop
+    of integer factorization.
+
+    see: https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm#Variants
+
+    Args:
+        n (int): The odd composite to factor
+        c (int): The constant of the iterated polynomial
+
+    Returns:
+        int: A divisor of n; either non-trivial, or n itself if this choice of c failed.
+    """
+    y, r, q, d = 2, 1, 1, 1
+    while d == 1:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and d == 1:
+            ys = y
+            for _ in range(min(_RHO_BATCH, r - k)):
+                y = (y * y + c) % n
+                q = q * (x - y) % n
+            d = math.gcd(q, n)
+            k += _RHO_BATCH
+        r *= 2
+
+    if d == n:
+        #The batched product hit a multiple of n; redo the last batch one step at a time
+        d = 1
+        while d == 1:
+            ys = (ys * ys + c) % n
+            d = math.gcd(x - ys, n)
+    return d
+
 def radical(n: Integer) -> Integer:
     """Computes the radical of an integer, defined
     as the product of its unique prime factors.
@@ -1,12 +1,40 @@
 """Operations on generalized polynomial expressions, both single and multivariate cases"""
 from numbers import Number
+import math
 import random
+import threading
+from functools import wraps
 
 from ..expressions import *
 from .expression_ops import contains, get_symbols
 from .algebraic_ops import algebraic_expand
 from .numerical_ops import gcd, mod_inverse
 
+"""Memoized gcds for the outermost running call to `polynomial_gcd` in each thread. The `cache`
+attribute is a dict while a call is running, and missing when the thread is idle"""
+_gcd_state = threading.local()
+
+"""Leading terms and monomial coefficients read during the outermost running polynomial routine in each 
+thread, keyed by the ids of the expression and the variable. Each entry holds both, so their ids are not 
+reused while it is alive. The `leading_terms` and `monomial_coefficients` attributes are dicts while a 
+routine is running, and missing when the thread is idle"""
+_term_state = threading.local()
+
+def _term_cache_scope(routine):
+    """Wraps a polynomial routine so that, when it is the outermost one running in its thread, the 
+    leading terms and monomial coefficients read during the call are cached until it returns."""
+    @wraps(routine)
+    def scoped(*args, **kwargs):
+        if hasattr(_term_state, "leading_terms"):
+            return routine(*args, **kwargs)
+        _term_state.leading_terms = {}
+        _term_state.monomial_coefficients = {}
+        try:
+            return routine(*args, **kwargs)
+        finally:
+            del _term_state.leading_terms
+            del _term_state.monomial_coefficients
+    return scoped
 
 def is_monomial(expr: Expression, vars: Expression | set[Expression]) -> bool:
     """Checks whether the given expression is a monomial in the given variables.
@@ -24,13 +52,13 @@ def is_monomial(expr: Expression, vars: Expression | set[Expression]) -> bool:
         return True
     
     operation = type(expr)
-    if operation == Power:
+    if operation is Power:
             base = expr.base()
             exponent = expr.exponent()
             if base in vars and isinstance(exponent, Integer) and Integer(1) < exponent:
                 return True
             
-    elif operation == Product:
+    elif operation is Product:
             for factor in expr.operands():
                 if not is_monomial(factor, vars):
                     return False
@@ -79,29 +107,10 @@ def variables(expr: Expression) -> set[Expression]:
     Returns:
         set[Expression]: The set of parameters, or the empty set
     """
-    if isinstance(expr, Constant) or not isinstance(expr, Expression):
+    if not isinstance(expr, Expression):
         return set()
-
-    operation = type(expr)
-    if operation == Power:
-        exponent = expr.exponent()
-        if isinstance(exponent, Integer) and Integer(1) < exponent:
-            return {expr.base()}
-        return {expr}
-
-    elif operation == Sum:
-        vars = set()
-        for term in expr.operands():
-            vars |= variables(term)
-        return vars
-
-    elif operation == Product:
-        vars = set()
-        for factor in expr.operands():
-            vars |= variables(factor)
-        return vars
-
-    return {expr}
+    #Copied, since the cached variables are shared by every caller
+    return set(expr.poly_vars)
 
 def _fill_variables(expr: Expression, vars: Expression | list[Expression]) -> list[Expression]:
     """For many of the following algorithm, it is necessary to get a list of parameters for a given
@@ -185,27 +194,55 @@ def _coefficient_monomial(expr: Expression, var: Expression) -> list[Expression]
     Returns:
         list[Expression] | None: The list [a, n], or None if the operation fails.
     """
+    #Every coefficient and degree lookup reads each term through here, so results are cached for the running routine
+    monomial_coefficients = getattr(_term_state, "monomial_coefficients", None)
+    if monomial_coefficients is None or not isinstance(expr, Expression):
+        return _split_monomial(expr, var)
+    key = (id(expr), id(var))
+    entry = monomial_coefficients.get(key)
+    if entry is None:
+        entry = monomial_coefficients[key] = (expr, var, _split_monomial(expr, var))
+    return entry[2]
+
+def _split_monomial(expr: Expression, var: Expression) -> list[Expression] | None:
+    """Uncached _coefficient_monomial."""
     if expr == var:
         return [Integer(1), Integer(1)]
 
+    #A constant, or a variable other than x, cannot contain x
+    if isinstance(expr, (Constant, Variable)):
+        return [expr, Integer(0)]
+
     operation = type(expr)
-    if operation == Power:
+    if operation is Power:
         base = expr.base()
         exponent = expr.exponent()
         if base == var and isinstance(exponent, Integer) and Integer(1) < exponent:
             return [Integer(1), exponent]
         
-    elif operation == Product:
+    elif operation is Product:
         m = Integer(0)
-        c = expr
+        rest = []
         for factor in expr.operands():
             factor_coeff = _coefficient_monomial(factor, var)
             if factor_coeff is None:
                 return None
             coeff, degree = factor_coeff
             if degree != 0:
-                m = degree
-                c = expr / (var ** m)
+                m += degree
+            else:
+                rest.append(factor)
+
+        if m == 0:
+            return [expr, m]
+
+        #The coefficient is the product of the other factors, which are still in canonical order
+        if len(rest) == 0:
+            c = Integer(1)
+        elif len(rest) == 1:
+            c = rest[0]
+        else:
+            c = Product(*rest)
         return [c, m]
 
     if not contains(expr, var):
@@ -228,27 +265,30 @@ def degree(expr: Expression, vars: Expression | set[Expression]) -> Integer | No
     #I'll default to UNDEFINED until -oo is implemented.
     if expr == 0:
         return UNDEFINED
-    vars = {vars} if not isinstance(vars, set) else vars
-    if isinstance(expr, Sum):
-        deg = Integer(0)
-        for term in expr.operands():
-            deg_sum = Integer(0)
-            for var in vars:
-                monomial = _coefficient_monomial(term, var)
-                if monomial is None:
-                    return None
-                deg_sum += monomial[1]
-            deg = deg_sum if deg < deg_sum else deg
-        return deg
-
-    else:
-        deg_sum = Integer(0)
-        for var in vars:
-            monomial = _coefficient_monomial(expr, var)
-            if monomial is None:
-                return None
-            deg_sum += monomial[1]
-        return deg_sum
+    #Within a polynomial routine, the leading term is cached per call in _term_state, not on the node
+    if not isinstance(vars, set):
+        f = _degree_leading_coefficient(expr, vars)
+        return None if f is None else f[0]
+    terms = expr.operands() if isinstance(expr, Sum) else (expr,)
+    degrees = [_total_degree(term, vars) for term in terms]
+    if None in degrees:
+        return None
+    return Integer(max(degrees))
+
+def _total_degree(term: Expression, vars: set[Expression]) -> int | None:
+    """The sum of the degrees of a monomial in each of the given variables, or None if 
+    the term is not a monomial in them."""
+    free = term.free_vars if isinstance(term, Expression) else frozenset()
+    deg = 0
+    for var in vars:
+        #A variable that does not occur in the term contributes nothing
+        if isinstance(var, Variable) and var not in free:
+            continue
+        monomial = _coefficient_monomial(term, var)
+        if monomial is None:
+            return None
+        deg += monomial[1].value
+    return deg
 
 def leading_coefficient(expr: Expression, var: Expression) -> Expression | None:
     """Given a generalized polynomial expression u with parameter x, returns 
@@ -261,25 +301,50 @@ def leading_coefficient(expr: Expression, var: Expression) -> Expression | None:
     Returns:
         Expression | None: Coefficient of the highest power of x
     """
-    if isinstance(expr, Sum):
-        deg = Integer(0)
-        coeff = Integer(0)
-        for term in expr.operands():
-            deg_sum = Integer(0)
-            coeff_sum = Integer(0)
-            monomial = _coefficient_monomial(term, var)
-            if monomial is None:
-                return None
-            deg_sum += monomial[1]
-            coeff_sum += monomial[0]
-            if deg == deg_sum:
-                coeff += coeff_sum
-            elif deg < deg_sum:
-                deg = deg_sum
-                coeff = coeff_sum
-        return coeff
-    else:
-        return _coefficient_monomial(expr, var)[0]
+    f = _degree_leading_coefficient(expr, var)
+    if f is None:
+        return None
+    return f[1]
+
+def _degree_leading_coefficient(expr: Expression, var: Expression) -> tuple[Integer, Expression] | None:
+    """Given a generalized polynomial expression u with parameter x, returns both
+    the degree of x in u and its leading coefficient, from a single pass over the terms of u.
+
+    Unlike degree(), the zero polynomial is given degree 0 here.
+
+    Args:
+        expr (Expression): The expression u
+        var (Expression): The parameter x
+
+    Returns:
+        tuple[Integer, Expression] | None: (degree, leading coefficient), or None if the operation fails
+    """
+    #Division and gcd loops ask for the same polynomial's leading term repeatedly, so it is cached for the running routine
+    leading_terms = getattr(_term_state, "leading_terms", None)
+    if leading_terms is None or not isinstance(expr, Expression):
+        return _leading_term(expr, var)
+    key = (id(expr), id(var))
+    entry = leading_terms.get(key)
+    if entry is None:
+        entry = leading_terms[key] = (expr, var, _leading_term(expr, var))
+    return entry[2]
+
+def _leading_term(expr: Expression, var: Expression) -> tuple[Integer, Expression] | None:
+    """Uncached _degree_leading_coefficient."""
+    terms = expr.operands() if isinstance(expr, Sum) else (expr,)
+    deg = Integer(0)
+    coeff = Integer(0)
+    for term in terms:
+        monomial = _coefficient_monomial(term, var)
+        if monomial is None:
+            return None
+        term_coeff, term_deg = monomial
+        if deg == term_deg:
+            coeff += term_coeff
+        elif deg < term_deg:
+            deg = term_deg
+            coeff = term_coeff
+    return deg, coeff
 
 def lex_lt(first: Expression, second: Expression, ordering: list[Expression]) -> bool:
     """Returns the monomial ordering of two expressions. True if first < second, 
@@ -296,16 +361,19 @@ def lex_lt(first: Expression, second: Expression, ordering: list[Expression]) ->
     Returns:
         bool: True if first < second; False otherwise
     """
-    for var in ordering:
-        first_deg = degree(first, var)
-        second_deg = degree(second, var)
-        if first_deg == second_deg:
-            continue
+    #Tuples compare lexicographically, element by element
+    return _monomial_key(first, ordering) < _monomial_key(second, ordering)
 
-        return True if first_deg < second_deg else False
+def _monomial_key(expr: Expression, ordering: list[Expression]) -> tuple[Integer, ...]:
+    """The degrees of a monomial in each variable of the ordering. Sorting monomials by this key 
+    orders them as lex_lt does, computing the degrees once per monomial rather than per comparison.
 
-    return False
+    Inside a polynomial routine, the degrees are also read from the per-call _term_state cache, 
+    so each of a monomial's degrees is only computed once until the outermost routine returns.
+    """
+    return tuple(degree(expr, var) for var in ordering)
 
+@_term_cache_scope
 def leading_monomial(expr: Expression, ordering: list[Expression]) -> Expression:
     """Returns the leading monomial of a rational polynomial expression. The order of monomials
     is ordered based on the given lexicographical ordering.
@@ -327,15 +395,14 @@ def leading_monomial(expr: Expression, ordering: list[Expression]) -> Expression
     """
     ordering = ordering if isinstance(ordering, list) else [ordering]
 
-    if len(ordering) == 0:
-        return expr
-
-    var = ordering[0]
-    remaining = ordering[1::]
-    exponent = degree(expr, var)
-    coeff = coefficient(expr, var, exponent)
-    return var**exponent * leading_monomial(coeff, remaining)
+    #Each variable in turn narrows the polynomial down to the coefficient of its highest power
+    monomial = Integer(1)
+    for var in ordering:
+        exponent, expr = _degree_leading_coefficient(expr, var)
+        monomial *= var**exponent
+    return monomial * expr
 
+@_term_cache_scope
 def polynomial_divide_recursive(u: Expression, v: Expression, L: list[Expression]) -> tuple[Expression]:
     """Recursively computes the polynomial quotient of u and v.
 
@@ -352,21 +419,55 @@ def polynomial_divide_recursive(u: Expression, v: Expression, L: list[Expression
         return [u / v, Integer(0)]
     
     x = L[0]
-    r = u
-    m, n = degree(r, x), degree(v, x)
-    q = 0
-    lcv = leading_coefficient(v, x)
-    while not m < n: #Iterate until degree of the that of the divisor.
-        lcr = leading_coefficient(r, x)
-        c, rem = polynomial_divide_recursive(lcr, lcv, L[1::])
+    R = L[1::]
+    n, lcv = _degree_leading_coefficient(v, x)
+    m = degree(u, x)
+    if m is UNDEFINED or m < n:
+        return (Integer(0), u)
+
+    #The remainder is kept as a list of coefficients in x, so each step only updates the
+    #coefficients it touches rather than expanding the whole remainder again
+    n = int(n)
+    r_coeffs = _dense_coefficients(u, x, int(m))
+    v_coeffs = _dense_coefficients(v, x, n)
+    q_coeffs = {}
+    m = len(r_coeffs) - 1
+    while m >= n:
+        c, rem = polynomial_divide_recursive(r_coeffs[m], lcv, R)
         if rem != 0 or c == 0:
             break
 
-        q += c * x ** (m - n)
-        r = algebraic_expand(r - c * v * x **(m -n))
-        m = degree(r, x)
-        if m is UNDEFINED: break # TODO: Update this when degree(0) changes.
-    return (algebraic_expand(q), r)
+        q_coeffs[m - n] = c
+        for i in range(n):
+            r_coeffs[m - n + i] = algebraic_expand(r_coeffs[m - n + i] - c * v_coeffs[i])
+        r_coeffs[m] = Integer(0)
+        while m >= 0 and r_coeffs[m] == 0:
+            m -= 1
+
+    if not q_coeffs:
+        return (Integer(0), u)
+    q = algebraic_expand(sum((c * x ** k for k, c in q_coeffs.items()), Integer(0)))
+    r = algebraic_expand(sum((c * x ** k for k, c in enumerate(r_coeffs[:m + 1])), Integer(0)))
+    return (q, r)
+
+def _dense_coefficients(expr: Expression, var: Expression, deg: int) -> list[Expression]:
+    """Given a polynomial expression u in x of degree n, returns the list of coefficients 
+    of x^0, ..., x^n in u, from a single pass over its terms.
+
+    Args:
+        expr (Expression): The polynomial u
+        var (Expression): The parameter x
+        deg (int): The degree n of x in u
+
+    Returns:
+        list[Expression]: The coefficients, indexed by degree
+    """
+    coeffs = [Integer(0)] * (deg + 1)
+    terms = expr.operands() if isinstance(expr, Sum) else (expr,)
+    for term in terms:
+        term_coeff, term_deg = _coefficient_monomial(term, var)
+        coeffs[int(term_deg)] += term_coeff
+    return coeffs
 
 def monomial_divide(dividend: Expression, divisor: Expression) -> Expression:
     """Computes the division u / v, where u is a polynomial and v is a monomial,
@@ -380,9 +481,15 @@ def monomial_divide(dividend: Expression, divisor: Expression) -> Expression:
         Expression: The list [Q, R] where Q is the quotient and R the remainder of the division.
     """
     terms = dividend.operands() if isinstance(dividend, Sum) else [dividend]
+    divisor_degrees = _monomial_degrees(divisor)
     quotient = Integer(0)
     remainder = Integer(0)
     for term in terms:
+        #Terms whose degrees fall short of the divisor's in some variable cannot be divided
+        if divisor_degrees is not None and _falls_short(term, divisor_degrees):
+            remainder += term
+            continue
+
         term_quot = term / divisor
         if isinstance(term_quot.denom(), (Constant, Number)):
             quotient += term_quot
@@ -390,6 +497,31 @@ def monomial_divide(dividend: Expression, divisor: Expression) -> Expression:
             remainder += term
     return [quotient, remainder]
 
+def _monomial_degrees(monomial: Expression) -> dict[Variable, Integer] | None:
+    """The degree of a monomial in each of its variables, or None if it is not a monomial
+    in Variables alone."""
+    degrees = {}
+    for var in variables(monomial):
+        if not isinstance(var, Variable):
+            return None
+        split = _coefficient_monomial(monomial, var)
+        if split is None:
+            return None
+        degrees[var] = split[1]
+    return degrees
+
+def _falls_short(term: Expression, degrees: dict[Variable, Integer]) -> bool:
+    """Checks whether a term has a lower degree than the given one in some variable. Terms
+    that are not monomials in one of the variables are not decided here, and return False."""
+    for var, deg in degrees.items():
+        monomial = _coefficient_monomial(term, var)
+        if monomial is None:
+            return False
+        if monomial[1] < deg:
+            return True
+    return False
+
+@_term_cache_scope
 def polynomial_divide(dividend: Expression, divisor: Expression, ordering: list[Expression]) -> tuple[Expression]:
     """Given two general polynomial expressions with rational coefficients, performs monomial-based
     division and returns the result [Quotient, Remainder]
@@ -405,6 +537,14 @@ def polynomial_divide(dividend: Expression, divisor: Expression, ordering: list[
     Returns:
         list[Expression]: The list [Q, R] where Q is the quotient and R the remainder of the division.
     """
+    ordering = ordering if isinstance(ordering, list) else [ordering]
+    dividend_terms = _monomial_dict(dividend, ordering)
+    divisor_terms = _monomial_dict(divisor, ordering)
+    if dividend_terms is not None and divisor_terms:
+        quotient_terms, remainder_terms = _monomial_dict_divide(dividend_terms, divisor_terms)
+        return (_from_monomial_dict(quotient_terms, ordering), _from_monomial_dict(remainder_terms, ordering))
+
+    #Coefficients involving other parameters are divided as expressions
     quotient = Integer(0)
     remainder = dividend
     lm = leading_monomial(divisor, ordering)
@@ -415,22 +555,117 @@ def polynomial_divide(dividend: Expression, divisor: Expression, ordering: list[
         f = monomial_divide(remainder, lm)[0]
     return (quotient, remainder)
 
+def _monomial_dict(expr: Expression, ordering: list[Expression]) -> dict[tuple[int, ...], Constant] | None:
+    """Splits a polynomial with rational coefficients into a dict taking the exponent vector of each
+    monomial, in the given ordering, to its coefficient. Tuples compare lexicographically, so the 
+    largest key is the leading monomial.
+
+    Args:
+        expr (Expression): A rational polynomial in the generalized variables of the ordering
+        ordering (list[Expression]): Ordered list of generalized variables
+
+    Returns:
+        dict[tuple[int, ...], Constant] | None: The monomials of the polynomial, or None if a 
+            coefficient is not a rational number.
+    """
+    expr = convert_primitive(expr)
+    terms = expr.operands() if isinstance(expr, Sum) else (expr,)
+    monomials = {}
+    for term in terms:
+        exponents = []
+        for var in ordering:
+            monomial = _coefficient_monomial(term, var)
+            if monomial is None:
+                return None
+            term, exponent = monomial
+            exponents.append(int(exponent))
+        if not isinstance(term, Constant):
+            return None
+        if term != 0:
+            monomials[tuple(exponents)] = term
+    return monomials
+
+def _monomial_dict_divide(dividend: dict[tuple[int, ...], Constant], divisor: dict[tuple[int, ...], Constant]) -> tuple[dict, dict]:
+    """polynomial_divide on the monomial dicts of _monomial_dict. Each step divides every term of the
+    remainder that the leading monomial of the divisor divides, as monomial_divide does, then subtracts
+    the product with the divisor in place.
+
+    Args:
+        dividend (dict[tuple[int, ...], Constant]): Monomials of the dividend
+        divisor (dict[tuple[int, ...], Constant]): Monomials of the (nonzero) divisor
+
+    Returns:
+        tuple[dict, dict]: The monomials of the quotient and remainder
+    """
+    lm = max(divisor)
+    lc = divisor[lm]
+    quotient = {}
+    remainder = dict(dividend)
+    while True:
+        f = {}
+        for exponents, coeff in remainder.items():
+            shift = tuple(e - l for e, l in zip(exponents, lm))
+            if min(shift, default=0) >= 0:
+                f[shift] = coeff / lc
+        if not f:
+            return quotient, remainder
+
+        for shift, f_coeff in f.items():
+            quotient[shift] = quotient.get(shift, Integer(0)) + f_coeff
+            for exponents, coeff in divisor.items():
+                key = tuple(e + s for e, s in zip(exponents, shift))
+                new_coeff = remainder.get(key, Integer(0)) - f_coeff * coeff
+                if new_coeff == 0:
+                    remainder.pop(key, None)
+                else:
+                    remainder[key] = new_coeff
+
+def _from_monomial_dict(monomials: dict[tuple[int, ...], Constant], ordering: list[Expression]) -> Expression:
+    """Rebuilds the polynomial expression from the monomial dict of _monomial_dict."""
+    terms = []
+    for exponents, coeff in monomials.items():
+        if coeff == 0:
+            continue
+        term = coeff
+        for var, exponent in zip(ordering, exponents):
+            if exponent != 0:
+                term *= var ** exponent
+        terms.append(term)
+    return sum(terms, Integer(0))
+
+@_term_cache_scope
 def polynomial_pseudo_divide(u, v, x):
-    p, s = 0, u
-    m, n = degree(s, x), degree(v, x)
+    if u == 0:
+        return Integer(0), Integer(0)
+    m, n = degree(u, x), degree(v, x)
     delta = m - n + 1
     if delta.is_negative():
         delta = 0
-    lcv = coefficient(v, x, n)
+
+    #As in polynomial_divide_recursive, both polynomials are kept as lists of their coefficients
+    #in x, and each coefficient is expanded on its own
+    m, n = int(m), int(n)
+    s_coeffs = _dense_coefficients(u, x, m)
+    v_coeffs = _dense_coefficients(v, x, n)
+    lcv = v_coeffs[n]
+    p_coeffs = [Integer(0)] * max(m - n + 1, 0)
     sigma = 0
-    while not m < n:
-        lcs = coefficient(s, x, m)
-        p = lcv * p + lcs * x**(m - n)
-        s = algebraic_expand(lcv * s - lcs * v * x ** (m - n))
+    while m >= n:
+        lcs = s_coeffs[m]
+        p_coeffs = [algebraic_expand(lcv * c) for c in p_coeffs]
+        p_coeffs[m - n] = algebraic_expand(p_coeffs[m - n] + lcs)
+        s_coeffs = [algebraic_expand(lcv * c) for c in s_coeffs[:m]]
+        for i in range(n):
+            s_coeffs[m - n + i] = algebraic_expand(s_coeffs[m - n + i] - lcs * v_coeffs[i])
         sigma += 1
-        m = degree(s, x)
-        if m is UNDEFINED: break # TODO: Update this when degree(0) changes
-    return algebraic_expand(lcv ** (delta - sigma) * p), algebraic_expand(lcv ** (delta - sigma) * s)
+        m -= 1
+        while m >= 0 and s_coeffs[m] == 0:
+            m -= 1
+
+    scale = algebraic_expand(lcv ** (delta - sigma))
+    p = sum((c * x ** k for k, c in enumerate(p_coeffs)), Integer(0))
+    s = sum((c * x ** k for k, c in enumerate(s_coeffs[:m + 1])), Integer(0))
+    return algebraic_expand(scale * p), algebraic_expand(scale * s)
 
 def _is_univariate(expr: Expression, var: Expression) -> bool:
     """Determines if an expression is univariate with respect 
@@ -443,7 +678,9 @@ def _is_univariate(expr: Expression, var: Expression) -> bool:
     Returns:
         bool: True if the polynomial expression is univariate wrt var
     """
-    return variables(expr) == variables(var)
+    #Compares the cached sets directly, rather than copies of them from variables()
+    expr_vars = expr.poly_vars if isinstance(expr, Expression) else frozenset()
+    return expr_vars == var.poly_vars
 
 def partial_fractions(num, factors, x) -> list[Expression] | None:
     """Compute the partial fraction decomposition for a univariate rational function.
@@ -570,6 +807,7 @@ def _solve_linear_system(eqns: list[Expression]) -> dict[Variable, Expression]:
 
     return soln
 
+@_term_cache_scope
 def polynomial_gcd(u: Expression, v: Expression, L: list[Expression]) -> Expression:
     """Given u, v that are two multivariate polynomials with variables in L and rational coefficients,
     computes the greatest common divisor gcd(u, v) and returns it (normalized).
@@ -582,11 +820,32 @@ def polynomial_gcd(u: Expression, v: Expression, L: list[Expression]) -> Express
     Returns:
         Expression: gcd(u, v)
     """
+    cache = getattr(_gcd_state, "cache", None)
+    if cache is None:
+        _gcd_state.cache = {}
+        try:
+            return polynomial_gcd(u, v, L)
+        finally:
+            del _gcd_state.cache
+
+    #Contents and leading coefficients repeat across the recursion, so gcds are memoized for the outermost call.
+    #Keyed by structure rather than by the repr-based equality, which can match different trees
+    key = tuple(operand._structure if isinstance(operand, Expression) else operand for operand in (u, v, *L))
+    if key not in cache:
+        cache[key] = _polynomial_gcd(u, v, L)
+    return cache[key]
+
+def _polynomial_gcd(u: Expression, v: Expression, L: list[Expression]) -> Expression:
+    """Uncached polynomial_gcd."""
     u, v = algebraic_expand(u), algebraic_expand(v)
     if u == 0:
         return _normalize(v, L)
     if v == 0:
         return _normalize(u, L)
+    if len(L) == 1:
+        g = _heuristic_gcd(u, v, L[0])
+        if g is not None:
+            return _normalize(g, L)
     return _normalize(_polynomial_gcd_rec(u, v, L), L)
 
 def _polynomial_gcd_rec(u, v, L):
@@ -606,6 +865,8 @@ def _polynomial_gcd_rec(u, v, L):
     if len(L) == 0:
         return gcd(u, v)
     
+    #Each level handles only L[0]. Its degree and coefficient lookups are cached in _term_state until the 
+    #outermost polynomial routine returns, not on the nodes themselves
     x, R = L[0], L[1::]
     U, V = (v, u) if degree(u, x) < degree(v, x) else (u, v)
     cont_U, cont_V = polynomial_content(U, x, R), polynomial_content(V, x, R)
@@ -624,9 +885,9 @@ def _polynomial_gcd_rec(u, v, L):
             else:
                 delta_p = delta
                 delta = degree(U, x) - degree(V, x) + 1
-                f = leading_coefficient(U, x)
-                psi = polynomial_divide_recursive(algebraic_expand(-f)**(delta_p - 1), algebraic_expand(psi**(delta_p - 2)), R)[0]
-                beta = algebraic_expand(-f * psi**(delta - 1))
+                neg_f = algebraic_expand(-leading_coefficient(U, x))
+                psi = polynomial_divide_recursive(algebraic_expand(neg_f**(delta_p - 1)), algebraic_expand(psi**(delta_p - 2)), R)[0]
+                beta = algebraic_expand(neg_f * psi**(delta - 1))
             U = V
             V = polynomial_divide_recursive(r, beta, L)[0]
             i += 1
@@ -638,16 +899,104 @@ def _polynomial_gcd_rec(u, v, L):
     pp_W = polynomial_divide_recursive(W, cont_W, L)[0]
     return algebraic_expand(d * pp_W)
 
+def _heuristic_gcd(u: Expression, v: Expression, x: Expression) -> Expression | None:
+    """Heuristic gcd of two univariate polynomials with integer coefficients (Char, Geddes and Gonnet).
+
+    Both polynomials are evaluated at a large integer xi, and a candidate gcd is read off 
+    the balanced base-xi digits of the integer gcd of the values. Since xi exceeds twice 
+    the smaller coefficient bound, a primitive candidate that divides both is the gcd.
+
+    Args:
+        u (Expression): u(x), a univariate polynomial
+        v (Expression): v(x), a univariate polynomial
+        x (Expression): The variable x
+
+    Returns:
+        Expression | None: The primitive gcd of u and v, up to sign, or None if the 
+        inputs are not integer polynomials in x or the heuristic fails.
+    """
+    u_coeffs, v_coeffs = _integer_coefficients(u, x), _integer_coefficients(v, x)
+    if u_coeffs is None or v_coeffs is None or len(u_coeffs) < 2 or len(v_coeffs) < 2:
+        return None
+    u_coeffs, v_coeffs = _primitive_coefficients(u_coeffs), _primitive_coefficients(v_coeffs)
+
+    bound = min(max(abs(c) for c in u_coeffs), max(abs(c) for c in v_coeffs))
+    xi = 2 * bound + 29
+    for _ in range(6):
+        h = math.gcd(_evaluate_coefficients(u_coeffs, xi), _evaluate_coefficients(v_coeffs, xi))
+
+        #The balanced base-xi digits of h are the coefficients of the candidate
+        g_coeffs = []
+        while h != 0:
+            digit = h % xi
+            if digit > xi // 2:
+                digit -= xi
+            g_coeffs.append(digit)
+            h = (h - digit) // xi
+        g_coeffs = _primitive_coefficients(g_coeffs)
+
+        if _divides_coefficients(g_coeffs, u_coeffs) and _divides_coefficients(g_coeffs, v_coeffs):
+            return sum((Integer(c) * x**i for i, c in enumerate(g_coeffs) if c != 0), Integer(0))
+        xi = xi * 73794 // 27011
+    return None
+
+def _integer_coefficients(expr: Expression, x: Expression) -> list[int] | None:
+    """The coefficients of a polynomial in x as a list of ints indexed by degree, 
+    or None if it is not a polynomial in x with integer coefficients."""
+    f = _degree_leading_coefficient(expr, x)
+    if f is None:
+        return None
+    coeffs = _dense_coefficients(expr, x, int(f[0]))
+    if not all(isinstance(c, Integer) for c in coeffs):
+        return None
+    return [int(c) for c in coeffs]
+
+def _primitive_coefficients(coeffs: list[int]) -> list[int]:
+    """Divides an integer coefficient list by its content, making the leading coefficient positive."""
+    content = 0
+    for c in coeffs:
+        content = math.gcd(content, c)
+    if coeffs[-1] < 0:
+        content = -content
+    return [c // content for c in coeffs]
+
+def _evaluate_coefficients(coeffs: list[int], value: int) -> int:
+    """Evaluates an integer coefficient list at the given point by Horner's rule."""
+    result = 0
+    for c in reversed(coeffs):
+        result = result * value + c
+    return result
+
+def _divides_coefficients(divisor: list[int], dividend: list[int]) -> bool:
+    """Checks whether one integer coefficient list divides another exactly over the integers."""
+    d = len(divisor) - 1
+    remainder = list(dividend)
+    for shift in range(len(dividend) - 1 - d, -1, -1):
+        q, r = divmod(remainder[shift + d], divisor[d])
+        if r != 0:
+            return False
+        if q == 0:
+            continue
+        for i, c in enumerate(divisor):
+            remainder[shift + i] -= q * c
+    return not any(remainder)
+
 def _normalize(u, L):
     if len(L) == 0:
         return abs(u)
 
     if u == 0:
         return u
-    
+
+    if not isinstance(u, Sum):
+        #The content of a single term is its own normalized leading coefficient; no gcds are needed
+        c = _normalize(leading_coefficient(u, L[0]), L[1::]).coefficient()
+        return u / c
+
     c = polynomial_content(u, L[0], L[1::]).coefficient()
     return u / c
 
+@_term_cache_scope
 def polynomial_content(expr: Expression, main_var: Expression, vars: list[Expression] | Expression) -> Expression:
     """Determines the polynomial content of a polynomial u in x. This is 
     a generalization of the greatest common denominator of coefficients.
@@ -668,8 +1017,12 @@ def polynomial_content(expr: Expression, main_var: Expression, vars: list[Expres
     terms = expr.operands() if isinstance(expr, Sum) else [expr]
     for term in terms:
         content = polynomial_gcd(content, leading_coefficient(term, main_var), vars)
+        #No further coefficient can reduce a unit content
+        if content == 1:
+            break
     return content
 
+@_term_cache_scope
 def reduce_mod_p(expr: Expression, x: Variable, p: int) -> Expression:
     """Reduces the coefficients of a univariate polynomial expression mod p,
     returns canonical form with coefficients in [0, p) and no zero terms.
@@ -682,20 +1035,62 @@ def reduce_mod_p(expr: Expression, x: Variable, p: int) -> Expression:
     Returns:
         Expression: The reduced polynomial canonical mod p.
     """
+    return _from_coefficients_mod_p(_coefficients_mod_p(expr, x, p), x)
+
+def _coefficients_mod_p(expr: Expression, x: Variable, p: int) -> list[int]:
+    """The coefficients of a univariate integer polynomial reduced mod p, as a list of ints indexed 
+    by degree with no trailing zeros. The zero polynomial is the empty list.
+    """
     expr = algebraic_expand(expr)
     d = degree(expr, x)
     if d is UNDEFINED:
-        return Integer(0)
-    
+        return []
+    coeffs = [int(c) % p for c in _dense_coefficients(expr, x, int(d))]
+    return _strip_coefficients(coeffs)
+
+def _strip_coefficients(coeffs: list[int]) -> list[int]:
+    """Drops the zero leading coefficients (trailing entries) of a coefficient list, in place."""
+    while coeffs and coeffs[-1] == 0:
+        coeffs.pop()
+    return coeffs
+
+def _from_coefficients_mod_p(coeffs: list[int], x: Variable) -> Expression:
+    """Rebuilds the canonical polynomial of a coefficient list from _coefficients_mod_p."""
     result = Integer(0)
-    for i in range(int(d) + 1):
-        c = coefficient(expr, x, i)
-        c = Integer(0) if c is None else c
-        c_mod = int(c) % p
-        if c_mod != 0:
-            result += Integer(c_mod) * x**i
+    for i, c in enumerate(coeffs):
+        if c != 0:
+            result += Integer(c) * x**i
     return result
 
+def _divmod_coefficients_mod_p(u: list[int], v: list[int], p: int) -> tuple[list[int], list[int]]:
+    """Long division of coefficient lists mod p. v must be nonzero mod p.
+
+    Returns:
+        tuple[list[int], list[int]]: The (quotient, remainder) coefficient lists
+    """
+    dv = len(v) - 1
+    lcv_inv = mod_inverse(v[dv], p)
+    remainder = list(u)
+    quotient = [0] * max(len(u) - dv, 0)
+    for shift in range(len(u) - 1 - dv, -1, -1):
+        c = remainder[shift + dv] * lcv_inv % p
+        if c == 0:
+            continue
+        quotient[shift] = c
+        for i, vi in enumerate(v):
+            remainder[shift + i] = (remainder[shift + i] - c * vi) % p
+    return _strip_coefficients(quotient), _strip_coefficients(remainder[:dv])
+
+def _sub_mul_coefficients_mod_p(a: list[int], q: list[int], b: list[int], p: int) -> list[int]:
+    """The coefficient list of a - q*b mod p."""
+    result = list(a) + [0] * max(len(q) + len(b) - 1 - len(a), 0)
+    for i, qi in enumerate(q):
+        if qi == 0:
+            continue
+        for j, bj in enumerate(b):
+            result[i + j] = (result[i + j] - qi * bj) % p
+    return _strip_coefficients(result)
+
 def rational_simplify(u: Expression) -> Expression:
     """Simplifies a rational expression by euclidean division.
 
@@ -720,6 +1115,7 @@ def rational_simplify(u: Expression) -> Expression:
     quot, rem = polynomial_divide(num, denom, sorted(syms))
     return rationalize(quot + rem / denom)
 
+@_term_cache_scope
 def polynomial_divide_mod_p(u: Expression, v: Expression, x: Variable, p: int) -> tuple[Expression, Expression]:
     """Univariate polynomial division with all arithmetic performed mod p.
 
@@ -734,29 +1130,16 @@ def polynomial_divide_mod_p(u: Expression, v: Expression, x: Variable, p: int) -
     Returns:
         tuple[Expression, Expression]: (quotient, remainder), both canonical mod p
     """
-    u = reduce_mod_p(u, x, p)
-    v = reduce_mod_p(v, x, p)
-    if v == 0:
+    #The division runs on plain int coefficients; expressions are only rebuilt for the result
+    u = _coefficients_mod_p(u, x, p)
+    v = _coefficients_mod_p(v, x, p)
+    if not v:
         raise ZeroDivisionError
 
-    dv = int(degree(v, x))
-    lcv_inv = mod_inverse(int(leading_coefficient(v, x)), p)
-
-    quotient = Integer(0)
-    remainder = u
-    dr = degree(remainder, x)
-
-    while remainder != 0 and dr is not UNDEFINED and int(dr) >= dv:
-        lcr = int(leading_coefficient(remainder, x))
-        c = (lcr * lcv_inv) % p
-        shift = int(dr) - dv
-        term = Integer(c) * x**shift
-        quotient += term
-        remainder = reduce_mod_p(remainder - term * v, x, p)
-        dr = degree(remainder, x)
-
-    return quotient, remainder
+    quotient, remainder = _divmod_coefficients_mod_p(u, v, p)
+    return _from_coefficients_mod_p(quotient, x), _from_coefficients_mod_p(remainder, x)
 
+@_term_cache_scope
 def polynomial_gcd_mod_p(u: Expression, v: Expression, x: Variable, p: int) -> Expression:
     """Computes gcd(u, v) mod p via the Euclidean algorithm, returned monic.
 
@@ -781,6 +1164,33 @@ def polynomial_gcd_mod_p(u: Expression, v: Expression, x: Variable, p: int) -> E
     lc_inv = mod_inverse(int(leading_coefficient(U, x)), p)
     return reduce_mod_p(Integer(lc_inv) * U, x, p)
 
+def polynomial_extended_gcd_mod_p(u: Expression, v: Expression, x: Variable, p: int) -> tuple[Expression, Expression, Expression]:
+    """Extended Euclidean algorithm mod p. Returns (gcd, s, t) with
+    s*u + t*v = gcd (mod p). Does NOT normalize gcd to 1.
+
+    Args:
+        u (Expression): First polynomial
+        v (Expression): Second polynomial
+        x (Variable): Polynomial variable
+        p (int): Prime modulus
+
+    Returns:
+        tuple[Expression, Expression, Expression]: (gcd, s, t), canonical mod p
+    """
+    #Runs on coefficient lists mod p, converting back to expressions only once the loop ends
+    r0, r1 = _coefficients_mod_p(u, x, p), _coefficients_mod_p(v, x, p)
+    s0, s1 = [1], []
+    t0, t1 = [], [1]
+
+    while r1:
+        q, r = _divmod_coefficients_mod_p(r0, r1, p)
+        r0, r1 = r1, r
+        s0, s1 = s1, _sub_mul_coefficients_mod_p(s0, q, s1, p)
+        t0, t1 = t1, _sub_mul_coefficients_mod_p(t0, q, t1, p)
+
+    return tuple(_from_coefficients_mod_p(coeffs, x) for coeffs in (r0, s0, t0))
+
+@_term_cache_scope
 def polynomial_mulmod(u: Expression, v: Expression, f: Expression, x: Variable, p: int) -> Expression:
     """Multiplies two polynomials and reduces the result modulo f and modulo p.
 
@@ -797,6 +1207,7 @@ def polynomial_mulmod(u: Expression, v: Expression, f: Expression, x: Variable,
     product = reduce_mod_p(algebraic_expand(u * v), x, p)
     return polynomial_divide_mod_p(product, f, x, p)[1]
 
+@_term_cache_scope
 def polynomial_pow_mod(base: Expression, exponent: int, f: Expression, x: Variable, p: int) -> Expression:
     """Computes base^exponent mod f mod p via repeated squaring.
 
@@ -2,10 +2,51 @@
 These operations perform simplification procedures, to transform binary ASTs into a normal form.
 """
 import math
+import threading
+from functools import wraps
 
 from ..expressions import *
 from ..operations import construct, get_symbols
 
+"""Simplified products and powers for the outermost running simplification pass in each thread, keyed by 
+the structure of the unsimplified expression. The `cache` attribute is a dict while a pass is running, and 
+missing when the thread is idle"""
+_simplify_state = threading.local()
+
+def _simplify_cache_scope(routine):
+    """Wraps a simplification pass so that, when it is the outermost one running in its thread, the 
+    products and powers simplified during the call are memoized until it returns."""
+    @wraps(routine)
+    def scoped(*args, **kwargs):
+        if hasattr(_simplify_state, "cache"):
+            return routine(*args, **kwargs)
+        _simplify_state.cache = {}
+        try:
+            return routine(*args, **kwargs)
+        finally:
+            del _simplify_state.cache
+    return scoped
+
+def _simplify_cached(expr: Expression, simplifier) -> Expression:
+    """Applies the given simplifier, memoized for the running simplification pass. Keyed by structure 
+    rather than by the repr-based equality, which can match different trees"""
+    cache = getattr(_simplify_state, "cache", None)
+    if cache is None:
+        return simplifier(expr)
+    key = expr._structure
+    if key not in cache:
+        cache[key] = simplifier(expr)
+    return cache[key]
+
+"""Numerical approximations used by `sym_eval`, keyed by the elementary function they approximate"""
+_APPROXIMATIONS = {
+    Sin : math.sin,
+    Cos : math.cos,
+    Ln  : math.log,
+    Exp : math.exp,
+}
+
+@_simplify_cache_scope
 def simplify(expr: Expression) -> Expression:
     """Given an algebraic expression expr, performs simplification procedures as
     defined in Chapter 3 of Mathematical Methods, returning a new ASAE (Automatically
@@ -25,23 +66,31 @@ def simplify(expr: Expression) -> Expression:
     if isinstance(expr, (Constant, Variable)):
         return expr
 
+    #Results of simplify are flagged, so re-simplifying them is a no-op
+    if expr._simplified:
+        return expr
+
     simplified_operands = [simplify(operand) for operand in expr.operands()]
     if UNDEFINED in simplified_operands:
         return UNDEFINED
     
     expr = construct(simplified_operands, operation)
     if operation == Power:
-        return simplify_power(expr)
+        simplified = simplify_power(expr)
     elif operation == Product:
-        return simplify_product(expr)
+        simplified = simplify_product(expr)
     elif operation == Sum:
-        return simplify_sum(expr)
+        simplified = simplify_sum(expr)
     elif operation == Div:
-        return simplify_div(expr)
+        simplified = simplify_div(expr)
     elif operation == Factorial:
-        return simplify_factorial(expr)
+        simplified = simplify_factorial(expr)
     else:
-        return expr
+        simplified = expr
+
+    if isinstance(simplified, Expression) and not simplified._simplified:
+        simplified._simplified = True
+    return simplified
 
 def simplify_power(expr: Power) -> Expression:
     """Given a power v ^ w, returns a simplified expression or the 
@@ -55,7 +104,10 @@ def simplify_power(expr: Power) -> Expression:
     """
     if not isinstance(expr, Power):
         return expr
+    return _simplify_cached(expr, _simplify_power)
 
+def _simplify_power(expr: Power) -> Expression:
+    """Uncached simplify_power."""
     v = expr.base()
     w = expr.exponent()
 
@@ -102,7 +154,11 @@ def simplify_product(expr: Product) -> Expression:
     """
     if not isinstance(expr, Product):
         return expr
-    
+    #Within a trigonometric pass, the same products are rebuilt by the arithmetic of many sub-steps
+    return _simplify_cached(expr, _simplify_product)
+
+def _simplify_product(expr: Product) -> Expression:
+    """Uncached simplify_product."""
     factors = expr.operands()
     if 0 in factors:
         return Integer(0)
@@ -238,11 +294,12 @@ def flatten_factors(factors: list[Expression]) -> list[Expression]:
                 return [u_1, u_2]
             
     elif num_factors > 2:
-        remaining = flatten_factors(factors[1::])
-        if u_1_prod:
-            return merge_factors(u_1.operands(), remaining)
-        else:
-            return merge_factors([u_1], remaining)
+        #Each factor is merged into the flattened factors after it, from the last pair backwards
+        merged = flatten_factors(factors[-2::])
+        for u in reversed(factors[:-2]):
+            u = convert_primitive(u)
+            merged = merge_factors(u.operands() if isinstance(u, Product) else [u], merged)
+        return merged
 
 def merge_factors(first_factors: list[Expression], second_factors: list[Expression]) -> list[Expression]:
     """Given two lists of factors, merges them into a single list of factors in sorted order. This applies
@@ -255,30 +312,32 @@ def merge_factors(first_factors: list[Expression], second_factors: list[Expressi
     Returns:
         list[Expression]: The merged list of factors
     """
-    if len(second_factors) == 0:
-        return first_factors
-    
-    elif len(first_factors) == 0:
-        return second_factors
-    
-    else:
-        p = first_factors[0]
-        q = second_factors[0]
-        rest_p = first_factors[1::]
-        rest_q = second_factors[1::]
+    merged = []
+    i, j = 0, 0
+    while i < len(first_factors) and j < len(second_factors):
+        p = first_factors[i]
+        q = second_factors[j]
 
         h = flatten_factors([p, q])
         num_flattened = len(h)
         if num_flattened == 0:
-            return merge_factors(rest_p, rest_q)
+            i += 1
+            j += 1
         elif num_flattened == 1:
-            return h + merge_factors(rest_p, rest_q)
+            merged.append(h[0])
+            i += 1
+            j += 1
+        elif h == [p, q]:
+            merged.append(p)
+            i += 1
         else:
-            if h == [p, q]:
-                return [p] + merge_factors(rest_p, second_factors)
-            else:
-                assert h == [q, p]
-                return [q] + merge_factors(first_factors, rest_q)
+            assert h == [q, p]
+            merged.append(q)
+            j += 1
+
+    merged.extend(first_factors[i::])
+    merged.extend(second_factors[j::])
+    return merged
 
 def flatten_terms(terms: list[Expression]) -> list[Expression]:
     """Given a list of terms, combines those with like factors (e.g. 2x + 3x = 5x)
@@ -337,11 +396,12 @@ def flatten_terms(terms: list[Expression]) -> list[Expression]:
             return [u_1, u_2]
         
     elif num_terms > 2:
-        remaining = flatten_terms(terms[1::])
-        if u_1_sum:
-            return merge_terms(u_1.operands(), remaining)
-        else:
-            return merge_terms([u_1], remaining)
+        #Each term is merged into the flattened terms after it, from the last pair backwards
+        merged = flatten_terms(terms[-2::])
+        for u in reversed(terms[:-2]):
+            u = convert_primitive(u)
+            merged = merge_terms(u.operands() if isinstance(u, Sum) else [u], merged)
+        return merged
 
 def merge_terms(first_terms: list[Expression], second_terms: list[Expression]) -> list[Expression]:
     """Given two lists of terms, merges them into a single list of terms in sorted order. This applies
@@ -354,30 +414,32 @@ def merge_terms(first_terms: list[Expression], second_terms: list[Expression]) -
     Returns:
         list[Expression]: The merged list of terms
     """
-    if len(second_terms) == 0:
-        return first_terms
-    
-    elif len(first_terms) == 0:
-        return second_terms
-    
-    else:
-        p = first_terms[0]
-        q = second_terms[0]
-        rest_p = first_terms[1::]
-        rest_q = second_terms[1::]
+    merged = []
+    i, j = 0, 0
+    while i < len(first_terms) and j < len(second_terms):
+        p = first_terms[i]
+        q = second_terms[j]
 
         h = flatten_terms([p, q])
         num_flattened = len(h)
         if num_flattened == 0:
-            return merge_terms(rest_p, rest_q)
+            i += 1
+            j += 1
         elif num_flattened == 1:
-            return h + merge_terms(rest_p, rest_q)
+            merged.append(h[0])
+            i += 1
+            j += 1
+        elif h == [p, q]:
+            merged.append(p)
+            i += 1
         else:
-            if h == [p, q]:
-                return [p] + merge_terms(rest_p, second_terms)
-            else:
-                assert h == [q, p], f"{h=}\n {p=}\n {q=}"
-                return [q] + merge_terms(first_terms, rest_q)
+            assert h == [q, p], f"{h=}\n {p=}\n {q=}"
+            merged.append(q)
+            j += 1
+
+    merged.extend(first_terms[i::])
+    merged.extend(second_terms[j::])
+    return merged
 
 def sym_eval(expr: Expression, approximate: bool=False, **symbols: dict[Expression, Expression]) -> Expression:
     """Given a symbol table "symbols" and an expression "expr", evaluates the expression by replacing all symbols
@@ -433,29 +495,11 @@ def sym_eval(expr: Expression, approximate: bool=False, **symbols: dict[Expressi
             return Integer(math.factorial(operand))
         return Factorial(operand)
 
-    elif operation is Sin:
-        operand = convert_primitive(evaluated_operands[0])
-        if approximate and isinstance(operand, Constant):
-            return convert_primitive(math.sin(operand))
-        return Sin(operand)
-        
-    elif operation is Cos:
-        operand = convert_primitive(evaluated_operands[0])
-        if approximate and isinstance(operand, Constant):
-            return convert_primitive(math.cos(operand))
-        return Cos(operand)
-    
-    elif operation is Ln:
-        operand = convert_primitive(evaluated_operands[0])
-        if approximate and isinstance(operand, Constant):
-            return convert_primitive(math.log(operand))
-        return Ln(operand)
-
-    elif operation is Exp:
+    elif operation in _APPROXIMATIONS:
         operand = convert_primitive(evaluated_operands[0])
         if approximate and isinstance(operand, Constant):
-            return convert_primitive(math.exp(operand))
-        return Exp(operand)
+            return convert_primitive(_APPROXIMATIONS[operation](operand))
+        return operation(operand)
 
     else:
         return simplify(construct(evaluated_operands, operation))
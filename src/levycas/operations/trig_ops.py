@@ -5,9 +5,11 @@ trigonometric functions
 from ..expressions import *
 from .expression_ops import construct
 from .algebraic_ops import algebraic_expand_main, rationalize, algebraic_expand
+from .simplification_ops import _simplify_cache_scope
 
 from math import comb
 
+@_simplify_cache_scope
 def trig_simplify(expr: Expression) -> Expression:
     """Given an expression, returns an expression in contracted-trigonometric form
     that is simplified.
@@ -40,27 +42,37 @@ def trig_substitute(expr: Expression) -> Expression:
     Returns:
         Expression: An expression containing no trig functions other than sin/cos
     """
+    return _trig_substitute(expr, {})
+
+def _trig_substitute(expr: Expression, memo: dict) -> Expression:
+    """trig_substitute, memoized for the duration of one call. Sub-trees shared within the 
+    expression are substituted once; the memo is keyed by node identity and holds the node, 
+    so ids are not reused while it is alive."""
     if isinstance(expr, Constant) or isinstance(expr, Variable):
         return expr
 
-    operation = type(expr)
+    entry = memo.get(id(expr))
+    if entry is not None:
+        return entry[1]
 
-    new_operands = [trig_substitute(operand) for operand in expr.operands()]
-    new_expr = construct(new_operands, operation)
-    # new_expr = operation(*new_operands)
+    operation = type(expr)
+    new_operands = [_trig_substitute(operand, memo) for operand in expr.operands()]
 
     if operation == Tan:
-        return Sin(*new_operands) / Cos(*new_operands)
+        substituted = Sin(*new_operands) / Cos(*new_operands)
     elif operation == Csc:
-        return 1 / Sin(*new_operands)
+        substituted = 1 / Sin(*new_operands)
     elif operation == Sec:
-        return 1 / Cos(*new_operands)
+        substituted = 1 / Cos(*new_operands)
     elif operation == Cot:
-        return Cos(*new_operands) / Sin(*new_operands)
+        substituted = Cos(*new_operands) / Sin(*new_operands)
     else:
-        return construct(new_operands, operation)
-        # return operation(*new_operands)
+        substituted = construct(new_operands, operation)
+
+    memo[id(expr)] = (expr, substituted)
+    return substituted
 
+@_simplify_cache_scope
 def trig_expand(expr: Expression) -> Expression:
     """Given an expression, returns an equivalent expression in trigonometric-expanded form.
 
@@ -165,6 +177,7 @@ def _multiple_angle_cos(n: Integer, theta: Expression) -> Expression:
         expanded += (-1) ** (j // 2) * comb(n, j) * cos_theta ** (n - j) * sin_theta ** j
     return expanded
 
+@_simplify_cache_scope
 def trig_contract(expr: Expression) -> Expression:
     """Given an expression, returns an equivalent expression in trigonometric-contracted form.
 
@@ -47,6 +47,16 @@ class TestDerivative:
     def test_derivative_second_order(self):
         assert derivative(derivative(Sin(x), x), x) == -Sin(x)
 
+    def test_derivative_cache_distinct_reprs(self):
+        # Expressions built while differentiating are cached by structure, not by their colliding reprs
+        from levycas.operations.calculus_ops import _DerivativeCache
+        yx = Variable("yx")
+        first, second = Power(x*y, Integer(2)) * y, Power(yx, Integer(2)) * y
+        assert first == second
+        cache = _DerivativeCache(x)
+        cache.set(first, 2*x*y**3)
+        assert cache.get(second) is None
+
 class TestIntegrate:
     """Tests for the integrate operator"""
 
@@ -55,6 +65,17 @@ class TestIntegrate:
         assert integrate(Sin(Integer(1)), x) == Sin(Integer(1))*x
         assert integrate(Cos(Sin(Rational(-1, 2))), x) == Cos(Sin(Rational(-1, 2))) * x
 
+    def test_integrate_constant_times_sum(self):
+        # The constant part of a product is simplified, so the constant distributes over the sum
+        assert integrate(2*x*(y + 1), x) == (2*y + 2) * x**2 * Rational(1, 2)
+        assert integrate(-x*((4/3)*y - 4), x) == (-(4/3)*y + 4) * x**2 * Rational(1, 2)
+
+    def test_integrate_table_foreign_x(self):
+        # The integral table uses x as its anonymous variable; a free x must not be
+        # conflated with the variable of integration.
+        assert integrate(Sec(x) * Tan(y), y) == -Sec(x) * Ln(Cos(y))
+        assert integrate(Sec(y) * Tan(y), y) == Sec(y)
+
     def test_integrate__elementary_substitute(self):
         assert (
             integrate(Sin(x) * Cos(x), x)
@@ -417,6 +438,13 @@ class TestIntegrate:
              +  1/10*Arctan(x)
         )
 
+    def test_integrate_distinct_reprs(self):
+        # (x*y)^2 and yx^2 share a repr, but are memoized as different integrands
+        yx = Variable("yx")
+        integrated = integrate(Sum(Power(x*y, Integer(2)), Power(yx, Integer(2))), x)
+        assert integrated.free_vars == {x, y, yx}
+        assert integrated == Rational(1, 3) * x**3 * y**2 + x * yx**2
+
 class TestLimit:
     """Tests for the limit routine."""
 
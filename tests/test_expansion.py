@@ -1,5 +1,5 @@
 import pytest
-from levycas import symbols, Variable, algebraic_expand, algebraic_expand_main, rationalize
+from levycas import symbols, Variable, Integer, Sum, Product, Power, Sin, Factorial, Div, parse, simplify, algebraic_expand, algebraic_expand_main, rationalize
 
 class TestExpansion:
     """Tests for the algebraic_expand() and algebraic_expand_main() operators."""
@@ -71,6 +71,48 @@ class TestExpansion:
             == (x**2) + 2*x*(1 + x)**2 + (1 + x)**4
         )
 
+    def test_expansion_unchanged(self):
+        """Simplified expressions with nothing to expand are returned as-is"""
+        x, y = symbols('x y')
+        for expr in [x**2 + y, (x + y)**(1/2), (x + 1)**y + 2, 3*x*y**2]:
+            expr = simplify(expr)
+            assert algebraic_expand(expr) is expr
+        #Expansions are flagged as simplified, so expanding them again is a no-op
+        expanded = algebraic_expand((x + 1)**3 * y)
+        assert algebraic_expand(expanded) is expanded
+
+    def test_expansion_unsimplified(self):
+        """Unsimplified expressions are simplified, even with nothing to expand"""
+        x = Variable('x')
+        assert algebraic_expand(Sum(x, x)) == 2*x
+        assert algebraic_expand(Power(x, Integer(1))) == x
+        assert algebraic_expand(Sin(Sum(x, x))) == Sin(2*x)
+        assert algebraic_expand(Product(x, x)) == x**2
+        assert algebraic_expand(Product(Integer(2), x, Integer(3))) == 6*x
+
+    def test_expansion_then_simplify(self):
+        """Factorials and quotients are left for simplify, which must still reach them after expanding"""
+        x = Variable('x')
+        assert simplify(algebraic_expand(parse("x + 3!"))) == x + 6
+        assert simplify(algebraic_expand(parse("(x + 2!)^2"))) == x**2 + 4*x + 4
+        assert simplify(algebraic_expand(parse("x/x + 1"))) == 2
+        assert simplify(algebraic_expand(Factorial(Integer(5)))) == 120
+        assert simplify(algebraic_expand(Div(x, x))) == 1
+
+    def test_expansion_product_factorial(self):
+        """A product with a raw factorial is never flagged, so re-expanding it still leaves it to simplify"""
+        x, y = symbols('x y')
+        expanded = algebraic_expand(Product(x, Factorial(Integer(3)), y))
+        assert simplify(algebraic_expand(expanded)) == 6*x*y
+        expanded = algebraic_expand(Product(algebraic_expand((x + 1)**2), Factorial(Integer(3))))
+        assert simplify(algebraic_expand(expanded)) == 6*x**2 + 12*x + 6
+
+    def test_expansion_reciprocals(self):
+        """Reciprocal factors of a product are recombined into one denominator"""
+        x, y = symbols('x y')
+        assert algebraic_expand((1/2) * (y - 3)**-1) == (2*y - 6)**-1
+        assert algebraic_expand(x**-1 * (y - 3)**-1) == (x*y - 3*x)**-1
+
 class TestRationalization:
     """Tests for the rationalize() method"""
     pass
@@ -1,10 +1,14 @@
+import copy
+import pickle
+
 import pytest
 
-from levycas import Exp, Sin, Cos, Variable
+from levycas import Exp, Sin, Cos, Variable, Integer, Sum, Product, simplify, algebraic_expand, parse
 from levycas.operations.expression_ops import (
     symbols, get_symbols,
     contains, map_op, construct,
-    substitute, copy_expr
+    substitute, copy_expr,
+    common_subexpressions,
 )
 
 x, y, z = symbols("x y z")
@@ -14,6 +18,7 @@ def test_symbols():
     assert vars == (Variable('x'), Variable('y'), Variable('z'))
     x = symbols("  x  ")
     assert isinstance(x, Variable) and x == Variable('x')
+    assert x is Variable('x') and x is not Variable('y')
 
 def test_get_symbols():
     expr = Exp(x)**Sin(y) + 4*Cos(3+z)
@@ -26,6 +31,12 @@ def test_get_symbols():
     assert get_symbols(y) == {y,}
     assert get_symbols(z) == {z,}
 
+def test_free_vars():
+    expr = Exp(x)**Sin(y) + 4*Cos(3+z)
+    assert expr.free_vars == get_symbols(expr) == { x, y, z }
+    assert (Exp(4)**Sin(3) + 4*Cos(3)).free_vars == frozenset()
+    assert x.free_vars == {x,}
+
 def test_contains():
     expr = Exp(x) ** Sin(y) + 3*Cos(x*y) - 4*Sin(4*x**2+3*y+2)
     subs = [
@@ -43,13 +54,48 @@ def test_contains():
     assert not contains(1, x)
     assert not contains(Sin(x) + 3*Cos(x), y)
 
+def test_common_subexpressions():
+    expr = Sin(x) ** 2 + Cos(x) * Sin(x)
+    numbers = common_subexpressions(expr)
+    product, power = expr.operands()
+    assert numbers[id(power.base())] == numbers[id(product.operands()[1])]
+    assert numbers[id(power.base())] != numbers[id(product.operands()[0])]
+    assert len(set(numbers.values())) == 7
+
 def test_map_op():
-    ...
+    square_x = lambda expr: expr**2 if expr == x else expr
+    assert map_op(Sin(x) + x*y, square_x) == Sin(x**2) + x**2*y
+    assert map_op(Exp(x)**z, square_x) == Exp(x**2)**z
+    assert map_op(y, square_x) == y
 
 def test_copy_expr():
     expr = 4*(Exp(4*Sin(x**2 + 3*x + Cos(x))))
     copy = copy_expr(expr)
     assert expr is not copy and str(expr) == str(copy) and expr == copy
+    #Interned atoms are shared rather than copied
+    assert copy_expr(x) is x and copy_expr(Integer(1)) is Integer(1)
+
+def test_copy_and_pickle():
+    expr = x * y**z + z
+    for clone in (copy.copy(expr), copy.deepcopy(expr), pickle.loads(pickle.dumps(expr))):
+        assert clone == expr
+    #Variables and small Integers are interned, so copies resolve to the same object
+    assert copy.deepcopy(x) is x and pickle.loads(pickle.dumps(x)) is x
+    assert copy.deepcopy(Integer(2)) is Integer(2) and pickle.loads(pickle.dumps(Integer(2))) is Integer(2)
+
+def test_interned_integers_are_stateless():
+    #Interned Integers are shared process-wide, so simplifying and polynomial routines leave nothing on them
+    from levycas import simplify, algebraic_expand, polynomial_gcd, degree, Sum
+    assert simplify(Sum(x, -1 * x)) == 0
+    assert algebraic_expand((x + 2)**2 - 4) == x**2 + 4*x
+    assert polynomial_gcd(x**2 - 4, 2*x - 4, [x]) == x - 2
+    assert degree(Integer(2), x) == 0
+    for value in (0, 1, 2, 4):
+        assert set(vars(Integer(value))) <= {"value", "_repr", "_structure"}
+
+    expr = 3*x**2 + 1000*y
+    for clone in (copy.copy(expr), copy.deepcopy(expr), pickle.loads(pickle.dumps(expr))):
+        assert clone == expr
 
 def test_substitute():
     expr = Exp(x**2) * Sin(2*x**2 + 3) + Cos(x**2) ** Sin(2*x)
@@ -65,4 +111,18 @@ def test_substitute():
     assert (
         substitute(expr, Cos(x**2), x*y) ==
         Exp(x**2) * Sin(2*x**2 + 3) + (x*y) ** Sin(2*x)
-    )
\ No newline at end of file
+    )
+
+def test_substitute_simplifies():
+    #Rebuilt nodes are simplified, even where nothing was replaced
+    assert substitute(Sum(x, x), y, z) == 2*x
+    assert substitute(Sin(Product(x, x)) + y, y, z) == Sin(x**2) + z
+    #Simplified sub-trees that are left untouched are returned as they are
+    expr = simplify(Exp(x**2) * Sin(y))
+    assert substitute(expr, z, x) is expr
+
+def test_substitute_expansion_factorial():
+    #Raw factorials in an expansion are never flagged, so they are still simplified after substituting
+    expr = algebraic_expand(parse("x*y + 3!"))
+    assert simplify(substitute(expr, z, x)) == x*y + 6
+    assert simplify(substitute(expr, y, z)) == x*z + 6
@@ -74,6 +74,13 @@ def test_factor_integer():
             7: 3
         }
     )
+    assert (
+        factor_integer(1000000007 * 998244353)
+        == {
+            998244353: 1,
+            1000000007: 1
+        }
+    )
 
 def test_radical():
     assert (
@@ -2,6 +2,7 @@
 import pytest
 
 from levycas import *
+from levycas.operations.polynomial_ops import polynomial_divide_recursive, polynomial_extended_gcd_mod_p
 
 x, y, z = symbols("x y z")
 
@@ -31,6 +32,11 @@ def test_variables():
     assert variables(a*Sin(x)**2 + 2*b*Sin(x) + 3*c) == {a, b, c, Sin(x)}
     assert variables(1) == set()
 
+    #The variables are cached on the expression, so callers get their own copy
+    expr = a*x**2 + b*x + c
+    variables(expr).add(y)
+    assert variables(expr) == {a, b, c, x}
+
 def test_coefficient():
     x, y = symbols('x y')
     a, b, c = symbols(" a b c")
@@ -200,6 +206,14 @@ def test_polynomial_division():
         == (x, y**3)
     )
 
+def test_polynomial_division_recursive():
+    divide = lambda u, v: polynomial_divide_recursive(algebraic_expand(u), algebraic_expand(v), [x, y])
+
+    assert divide((x + y)**3 * (x - 2*y), (x - 2*y)) == (algebraic_expand((x + y)**3), 0)
+    assert divide(x**3 + 2*x + 1, 2*x + 1) == ((1/2)*x**2 - (1/4)*x + (9/8), -1/8)
+    assert divide(x**2*y + x, x*y + 1) == (x, 0)
+    assert divide(x + 1, x**2) == (0, x + 1)
+
 def test_polynomial_gcd():
     x, y, z = symbols("x y z")
 
@@ -299,6 +313,67 @@ def test_polynomial_gcd():
         == algebraic_expand((2 - y) * (1 - x))
     )
 
+def test_polynomial_gcd_univariate_integer():
+    #Univariate integer inputs take the heuristic gcd path; rational inputs fall back to sub-resultants
+    assert polynomial_gcd(6*x**3 - 6*x, 4*x**2 - 8*x + 4, [x]) == x - 1
+    assert polynomial_gcd(-(x - 31)*(x + 1), (x + 1)**2 * (x - 30), [x]) == x + 1
+    assert polynomial_gcd(algebraic_expand((100*x**2 - 3)*(x + 7)), algebraic_expand((100*x**2 - 3)*(x - 7)), [x]) == 100*x**2 - 3
+    assert polynomial_gcd(x**5 - 1, x**3 + 2, [x]) == 1
+    assert polynomial_gcd(algebraic_expand((x**2 - 1) / 2), x + 1, [x]) == x + 1
+
+_gcd_pairs = [
+    (algebraic_expand(u), algebraic_expand(v)) for u, v in [
+        ((1 + z) * (2 - y)**2 * (1 - x), (2 - y) * (1 - x) * (1 + x)**2),
+        ((x + y) * (x - z), (x + y) * (y + z)),
+        (x**2*y + y**2 + 1, x**3 + y**3 + x),
+    ]
+]
+
+@pytest.mark.parametrize("routine, calls", [
+    (polynomial_gcd, [(u, v, [x, y, z]) for u, v in _gcd_pairs]),
+    (polynomial_divide, [(u, v, [x, y, z]) for u, v in _gcd_pairs]),
+    (integrate, [(integrand, x) for integrand in (x * Exp(x), x**2 * Sin(x), 1 / ((x-1)*(x+2)), Ln(x), x * Cos(x))]),
+])
+def test_memo_threads(routine, calls):
+    #Each thread keeps its own memos, so concurrent calls don't share results
+    from concurrent.futures import ThreadPoolExecutor
+    expected = [routine(*args) for args in calls]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda args: routine(*args), calls * 4))
+    assert results == expected * 4
+
+def test_polynomial_gcd_distinct_reprs():
+    #(x*y)^2 and yx^2 share a repr, but are memoized as different polynomials within one call
+    from levycas.operations import polynomial_ops
+    yx = Variable("yx")
+    polynomial_ops._gcd_state.cache = {}
+    try:
+        assert polynomial_gcd(Power(x*y, Integer(2)), x**2, [x, y, yx]) == x**2
+        assert polynomial_gcd(Power(yx, Integer(2)), x**2, [x, y, yx]) == 1
+    finally:
+        del polynomial_ops._gcd_state.cache
+
+def test_polynomial_term_cache_scope():
+    #Leading terms are cached for the outermost running routine only, and dropped when it returns
+    from levycas.operations import polynomial_ops
+    u = algebraic_expand((x + y)**2 * (x - 1))
+    assert polynomial_divide_recursive(u, x + y, [x, y])[1] == 0
+    assert polynomial_gcd(u, algebraic_expand((x + y) * (x + 1)), [x, y]) == x + y
+    assert not hasattr(polynomial_ops._term_state, "leading_terms")
+    assert not hasattr(polynomial_ops._term_state, "monomial_coefficients")
+
+def test_polynomial_term_cache_releases_variables():
+    #Interned Integers are shared, so reading them as polynomials must not keep the variables alive
+    import gc, weakref
+    w = Variable("w_temporary")
+    ref = weakref.ref(w)
+    assert degree(Integer(2), w) == 0 and coefficient(Integer(2), w, 0) == 2
+    assert leading_coefficient(Integer(2), w) == 2
+    assert polynomial_divide(w**2 - 1, w - 1, [w]) == (w + 1, 0)
+    del w
+    gc.collect()
+    assert ref() is None
+
 def test_polynomial_degree_edge_cases():
     assert degree(Integer(5), x) == 0
     assert degree(Integer(0), x) == UNDEFINED # temp until -inf is implemented.
@@ -403,4 +478,17 @@ def test_gcd_mod_p():
     assert g == x + 6   # x - 1 canonicalized mod 7
 
     # gcd(f, 0) = f
-    assert polynomial_gcd_mod_p(x**2 + 2, Integer(0), x, 5) == x**2 + 2
\ No newline at end of file
+    assert polynomial_gcd_mod_p(x**2 + 2, Integer(0), x, 5) == x**2 + 2
+
+def test_extended_gcd_mod_p():
+    # s*u + t*v = gcd (mod p), with the gcd left unnormalized
+    u, v = x**2 + 2, x**2 + 3
+    g, s, t = polynomial_extended_gcd_mod_p(u, v, x, 5)
+    assert g != 0 and degree(g, x) == 0
+    assert reduce_mod_p(algebraic_expand(s*u + t*v), x, 5) == g
+
+    u = reduce_mod_p((x - 1)*(x + 1), x, 7)
+    v = reduce_mod_p((x - 1)*(x + 2), x, 7)
+    g, s, t = polynomial_extended_gcd_mod_p(u, v, x, 7)
+    assert degree(g, x) == 1
+    assert reduce_mod_p(algebraic_expand(s*u + t*v), x, 7) == g
\ No newline at end of file
@@ -149,6 +149,35 @@ class TestSimplification:
             (x*y*z) * (x*y**-1*z*a) == a * x**2 * z**2
         )
 
+    def test_simplify_idempotent(self):
+        x, y = symbols("x y")
+        expr = simplify(Sum(Product(x, Power(y, Integer(2))), Product(Integer(2), x, y, y)))
+        assert expr == 3*x*y**2
+        assert simplify(expr) is expr
+
+    def test_simplify_distinct_reprs(self):
+        """Trees whose reprs collide are still simplified independently"""
+        x, y = symbols("x y")
+        assert simplify(Power(x*y, Integer(2))) == x**2 * y**2
+        yx = Variable("yx")
+        expr = simplify(Power(yx, Integer(2)))
+        assert expr.free_vars == {yx} and expr.exponent() == 2
+
+    def test_simplify_cache_scope(self):
+        """Products and powers are memoized by structure within one pass, and dropped when it returns"""
+        from levycas.operations import simplification_ops
+        x, y = symbols("x y")
+        yx = Variable("yx")
+        simplification_ops._simplify_state.cache = {}
+        try:
+            assert simplify_power(Power(x*y, Integer(2))) == x**2 * y**2
+            expr = simplify_power(Power(yx, Integer(2)))
+            assert expr.free_vars == {yx} and expr.exponent() == 2
+        finally:
+            del simplification_ops._simplify_state.cache
+        assert trig_simplify(Sin(x)**2 + Cos(x)**2) == 1
+        assert not hasattr(simplification_ops._simplify_state, "cache")
+
     def test_sympy(self):
         """These tests were adapted from sympy/core/tests"""
         x = Rational(1, 5)
@@ -2,7 +2,7 @@
 import pytest
 
 from levycas.expressions import *
-from levycas import trig_simplify, trig_contract, trig_expand, symbols
+from levycas import trig_simplify, trig_contract, trig_expand, trig_substitute, symbols
 
 def test_trig_asimplify():
     """Tests for substitution and automatic simplification of trig operations"""
@@ -181,6 +181,15 @@ def test_trig_contract():
         == (1 / 8) * (3 - 4*Cos(2*x) + Cos(4*x))
     )
 
+def test_trig_substitute():
+    """trig_substitute rewrites in sin and cos, without sharing results between calls"""
+    x, y = symbols('x y')
+    assert trig_substitute(Tan(x)) == Sin(x) / Cos(x)
+    assert trig_substitute(Power(Sec(x * y), Integer(2))) == Cos(x * y)**-2
+    yx = Variable('yx')
+    assert trig_substitute(Tan(Power(x * y, Integer(2)))).free_vars == {x, y}
+    assert trig_substitute(Tan(Power(yx, Integer(2)))).free_vars == {yx}
+
 def test_trig_simplify():
     """Tests from the Elementary Algorithms for the trig_simplify() operator"""
     x = Variable('x')